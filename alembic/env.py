@@ -11,9 +11,16 @@ fileConfig(config.config_file_name)
 
 target_metadata = Base.metadata
 
+# Search columns and indexes are created by hand in migrations and are not
+# declared on the models, so autogenerate must not try to drop them.
+UNMANAGED_SUFFIXES = ("_tsv", "_trgm")
+
 def get_url():
     return settings.DATABASE_URL
 
+def include_object(object, name, type_, reflected, compare_to):
+    return not (reflected and compare_to is None and name.endswith(UNMANAGED_SUFFIXES))
+
 def run_migrations_offline():
     url = get_url()
     context.configure(
@@ -21,6 +28,7 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -37,7 +45,9 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
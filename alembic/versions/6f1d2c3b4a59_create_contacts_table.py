@@ -0,0 +1,46 @@
+"""create contacts table
+
+Revision ID: 6f1d2c3b4a59
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f1d2c3b4a59'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'contacts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('address', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_contacts_address'), 'contacts', ['address'], unique=False)
+    op.create_index(op.f('ix_contacts_email'), 'contacts', ['email'], unique=True)
+    op.create_index(op.f('ix_contacts_id'), 'contacts', ['id'], unique=False)
+    op.create_index(op.f('ix_contacts_name'), 'contacts', ['name'], unique=False)
+    op.create_index(op.f('ix_contacts_phone'), 'contacts', ['phone'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_contacts_phone'), table_name='contacts')
+    op.drop_index(op.f('ix_contacts_name'), table_name='contacts')
+    op.drop_index(op.f('ix_contacts_id'), table_name='contacts')
+    op.drop_index(op.f('ix_contacts_email'), table_name='contacts')
+    op.drop_index(op.f('ix_contacts_address'), table_name='contacts')
+    op.drop_table('contacts')
@@ -0,0 +1,36 @@
+"""slim contact indexes
+
+Drops the b-tree indexes no query uses, which every insert and update had to
+maintain: id duplicates the primary key, phone and address are only searched
+through the trigram and tsvector indexes, and name is replaced by (name, id),
+which also serves keyset pagination sorted by name.
+
+Revision ID: a7c4e2f9d3b8
+Revises: f2b6d8a4c1e7
+Create Date: 2026-10-17 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e2f9d3b8'
+down_revision: Union[str, None] = 'f2b6d8a4c1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DROPPED_INDEXES = ('id', 'name', 'phone', 'address')
+
+
+def upgrade() -> None:
+    op.create_index('ix_contacts_name_id', 'contacts', ['name', 'id'], unique=False)
+    for column in DROPPED_INDEXES:
+        op.drop_index(op.f(f'ix_contacts_{column}'), table_name='contacts')
+
+
+def downgrade() -> None:
+    for column in DROPPED_INDEXES:
+        op.create_index(op.f(f'ix_contacts_{column}'), 'contacts', [column], unique=False)
+    op.drop_index('ix_contacts_name_id', table_name='contacts')
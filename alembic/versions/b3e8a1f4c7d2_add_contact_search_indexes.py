@@ -0,0 +1,53 @@
+"""add contact search indexes
+
+Trigram indexes serve prefix and fuzzy matching on name, email and phone, and
+a generated tsvector column with a GIN index serves full-text search on
+address. Postgres only: other databases fall back to LIKE scans.
+
+Revision ID: b3e8a1f4c7d2
+Revises: 6f1d2c3b4a59
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8a1f4c7d2'
+down_revision: Union[str, None] = '6f1d2c3b4a59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Indexed expression per trigram index, matching app.services.contact.search_contacts.
+TRIGRAM_INDEXES = {
+    'ix_contacts_name_trgm': 'lower(name)',
+    'ix_contacts_email_trgm': 'lower(email)',
+    'ix_contacts_phone_trgm': 'phone',
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, expression in TRIGRAM_INDEXES.items():
+        op.create_index(
+            name, 'contacts', [sa.text(f'{expression} gin_trgm_ops')], postgresql_using='gin'
+        )
+    op.execute(
+        "ALTER TABLE contacts ADD COLUMN address_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(address, ''))) STORED"
+    )
+    op.create_index('ix_contacts_address_tsv', 'contacts', ['address_tsv'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_contacts_address_tsv', table_name='contacts')
+    op.drop_column('contacts', 'address_tsv')
+    for name in TRIGRAM_INDEXES:
+        op.drop_index(name, table_name='contacts')
@@ -0,0 +1,41 @@
+"""add idempotency keys
+
+Idempotency-Key of each POST /contacts request and the response it was
+served, replayed to retries until the key expires.
+
+Revision ID: c8e1f5a2b6d4
+Revises: a7c4e2f9d3b8
+Create Date: 2026-10-17 20:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f5a2b6d4'
+down_revision: Union[str, None] = 'a7c4e2f9d3b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('fingerprint', sa.String(), nullable=False),
+        sa.Column('status', sa.Integer(), nullable=True),
+        sa.Column('headers', sa.Text(), nullable=True),
+        sa.Column('body', sa.LargeBinary(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index(op.f('ix_idempotency_keys_expires_at'), 'idempotency_keys', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_idempotency_keys_expires_at'), table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,26 @@
+"""add contact version
+
+Revision ID: d91c6a2e5f08
+Revises: b3e8a1f4c7d2
+Create Date: 2026-10-17 12:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91c6a2e5f08'
+down_revision: Union[str, None] = 'b3e8a1f4c7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('contacts', 'version')
@@ -0,0 +1,53 @@
+"""add contact dedup
+
+Normalized email, phone and name columns that the deduplication job blocks
+candidate pairs on, and the table of merge suggestions it produces. Existing
+rows are backfilled by the job itself, in batches, rather than here.
+
+Revision ID: e5a7c3d9b1f4
+Revises: d91c6a2e5f08
+Create Date: 2026-10-17 16:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c3d9b1f4'
+down_revision: Union[str, None] = 'd91c6a2e5f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NORMALIZED_COLUMNS = ('email_normalized', 'phone_normalized', 'name_normalized')
+
+
+def upgrade() -> None:
+    for column in NORMALIZED_COLUMNS:
+        op.add_column('contacts', sa.Column(column, sa.String(), nullable=True))
+        op.create_index(op.f(f'ix_contacts_{column}'), 'contacts', [column], unique=False)
+    op.create_table(
+        'contact_merge_suggestions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('contact_id', sa.Integer(), nullable=False),
+        sa.Column('duplicate_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('reasons', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['contact_id'], ['contacts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['duplicate_id'], ['contacts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('contact_id', 'duplicate_id', name='uq_contact_merge_suggestions_pair'),
+    )
+    op.create_index(op.f('ix_contact_merge_suggestions_contact_id'), 'contact_merge_suggestions', ['contact_id'], unique=False)
+    op.create_index(op.f('ix_contact_merge_suggestions_duplicate_id'), 'contact_merge_suggestions', ['duplicate_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_contact_merge_suggestions_duplicate_id'), table_name='contact_merge_suggestions')
+    op.drop_index(op.f('ix_contact_merge_suggestions_contact_id'), table_name='contact_merge_suggestions')
+    op.drop_table('contact_merge_suggestions')
+    for column in reversed(NORMALIZED_COLUMNS):
+        op.drop_index(op.f(f'ix_contacts_{column}'), table_name='contacts')
+        op.drop_column('contacts', column)
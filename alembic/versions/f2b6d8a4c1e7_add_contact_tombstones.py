@@ -0,0 +1,53 @@
+"""add contact tombstones
+
+Deleted contacts are kept with deleted_at set so the change feed can report
+them. The email index becomes unique among live contacts only, and an index
+on (updated_at, id) serves the feed. A partial index on deleted_at covers
+only the tombstones, which the purge looks up. Rows that never got an
+updated_at are given their creation time, so the feed does not skip them.
+
+Revision ID: f2b6d8a4c1e7
+Revises: e5a7c3d9b1f4
+Create Date: 2026-10-17 18:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d8a4c1e7'
+down_revision: Union[str, None] = 'e5a7c3d9b1f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_CONTACTS = sa.text('deleted_at IS NULL')
+TOMBSTONES = sa.text('deleted_at IS NOT NULL')
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.drop_index('ix_contacts_email', table_name='contacts')
+    op.create_index(
+        'ix_contacts_email', 'contacts', ['email'], unique=True,
+        postgresql_where=LIVE_CONTACTS, sqlite_where=LIVE_CONTACTS,
+    )
+    op.execute('UPDATE contacts SET updated_at = created_at WHERE updated_at IS NULL')
+    op.create_index('ix_contacts_updated_at_id', 'contacts', ['updated_at', 'id'], unique=False)
+    op.create_index(
+        'ix_contacts_deleted_at', 'contacts', ['deleted_at'], unique=False,
+        postgresql_where=TOMBSTONES, sqlite_where=TOMBSTONES,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_deleted_at', table_name='contacts')
+    op.drop_index('ix_contacts_updated_at_id', table_name='contacts')
+    op.execute('DELETE FROM contact_merge_suggestions WHERE contact_id IN (SELECT id FROM contacts WHERE deleted_at IS NOT NULL) '
+               'OR duplicate_id IN (SELECT id FROM contacts WHERE deleted_at IS NOT NULL)')
+    op.execute('DELETE FROM contacts WHERE deleted_at IS NOT NULL')
+    op.drop_index('ix_contacts_email', table_name='contacts')
+    op.create_index('ix_contacts_email', 'contacts', ['email'], unique=True)
+    op.drop_column('contacts', 'deleted_at')
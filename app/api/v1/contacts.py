@@ -1,47 +1,254 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app.db.session import get_db
-from app.schemas.contact import Contact, ContactCreate
+from app.core.config import settings
+from app.core.etag import collection_etag, contact_etag, etag_matches, expected_version
+from app.db.session import get_db, get_read_db
+from app.schemas.contact import (
+    Contact,
+    ContactBatchDelete,
+    ContactBatchGet,
+    ContactBatchGetResult,
+    ContactBatchResult,
+    ContactBatchUpdate,
+    ContactChange,
+    ContactCreate,
+    ContactImportResult,
+    ContactMerge,
+    ContactMergeSuggestion,
+    ContactUpdate,
+)
 from app.services import contact as contact_service
+from app.services import contact_changes, contact_dedup, contact_import
 
-from typing import List
+from typing import List, Literal, Optional
 
 router = APIRouter()
 
 @router.post("/", response_model=Contact, status_code=201)
-def create_contact(contact: ContactCreate, db: Session = Depends(get_db)):
+def create_contact(contact: ContactCreate, response: Response, db: Session = Depends(get_db)):
     try:
-        return contact_service.create_contact(db, contact)
+        db_contact = contact_service.create_contact(db, contact)
     except IntegrityError as e:
         raise HTTPException(status_code=400, detail=str(e.statement))
+    response.headers["ETag"] = contact_etag(db_contact.id, db_contact.version)
+    return db_contact
+
+@router.post("/import", response_model=ContactImportResult)
+async def import_contacts(request: Request, db: Session = Depends(get_db)):
+    """
+    Bulk import contacts from a CSV (text/csv, with a header row) or NDJSON
+    (application/x-ndjson) body. The body is streamed and inserted in batches;
+    rows that fail validation or whose email already exists are reported by line.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = contact_import.IMPORT_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Body must be text/csv or application/x-ndjson")
+    lines = contact_import.aiter_lines(request.stream())
+    return await contact_import.import_stream(db, lines, fmt, settings.IMPORT_BATCH_SIZE)
+
+@router.post("/batch/get", response_model=ContactBatchGetResult)
+def read_contacts_batch(batch: ContactBatchGet, db: Session = Depends(get_read_db)):
+    """
+    Fetch many contacts by id in one query. Ids that do not exist are listed in "missing".
+    """
+    contacts = contact_service.get_contacts_by_ids(db, batch.ids)
+    found = {contact.id for contact in contacts}
+    return {
+        "contacts": [contact._asdict() for contact in contacts],
+        "missing": [contact_id for contact_id in dict.fromkeys(batch.ids) if contact_id not in found],
+    }
+
+@router.post("/batch/update", response_model=ContactBatchResult)
+def update_contacts_batch(batch: ContactBatchUpdate, db: Session = Depends(get_db)):
+    """
+    Update many contacts in one transaction. Each item may carry the version it
+    expects, like If-Match, and gets its own status in the results.
+    """
+    return {"results": contact_service.update_contacts(db, batch.items)}
+
+@router.post("/batch/delete", response_model=ContactBatchResult)
+def delete_contacts_batch(batch: ContactBatchDelete, db: Session = Depends(get_db)):
+    """
+    Delete many contacts in one transaction, with a status per item.
+    """
+    return {"results": contact_service.delete_contacts(db, batch.items)}
+
+@router.get("/changes", response_model=List[ContactChange])
+def read_changes(
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous call; omit to start from the beginning"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Contacts created, updated or deleted since the cursor, oldest first, for
+    incremental sync. Deleted contacts come with "deleted": true. The
+    X-Next-Cursor header is always set; poll with it to get later changes.
+    A cursor older than the tombstone retention fails with 410 and requires
+    a full resync.
+    """
+    try:
+        changes, next_cursor = contact_changes.get_changes(db, cursor, limit)
+    except contact_changes.CursorExpiredError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return Response(contact_changes.changes_to_json(changes), media_type="application/json", headers=headers)
+
+@router.get("/duplicates", response_model=List[ContactMergeSuggestion])
+def read_merge_suggestions(
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: int = Query(0, description="Id of the last suggestion of the previous page"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Probable duplicate pairs found by the deduplication job (scripts/dedup.py),
+    highest score first.
+    """
+    return contact_dedup.get_merge_suggestions(db, limit, after_id)
+
+@router.post("/merge", response_model=Contact)
+def merge_contacts(merge: ContactMerge, response: Response, db: Session = Depends(get_db)):
+    """
+    Merge duplicate contacts into one: empty fields of the kept contact are
+    filled from the duplicates, which are then deleted.
+    """
+    try:
+        db_contact = contact_dedup.merge_contacts(db, merge.contact_id, merge.duplicate_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if db_contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    response.headers["ETag"] = contact_etag(db_contact.id, db_contact.version)
+    return db_contact
+
+# Media types of the export formats.
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
 
+@router.get("/export", response_class=StreamingResponse)
+def export_contacts(format: Literal["ndjson", "csv"] = "ndjson", db: Session = Depends(get_read_db)):
+    """
+    Stream every contact as NDJSON or CSV without loading the table into memory.
+    """
+    return StreamingResponse(
+        contact_service.export_contacts(db, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format}"'},
+    )
+
+# Rows are serialized straight to JSON, so response_model only documents the shape.
 @router.get("/", response_model=List[Contact])
-def read_contacts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    contacts = contact_service.get_contacts(db, skip, limit)
-    return contacts
+def read_contacts(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    sort: Literal["id", "name"] = "id",
+    count: Optional[Literal["exact", "estimated", "counter"]] = Query(
+        None, description="Also return the total number of contacts in X-Total-Count, counted with this strategy"
+    ),
+    db: Session = Depends(get_read_db),
+):
+    if cursor:
+        if skip:
+            raise HTTPException(status_code=400, detail="skip cannot be combined with cursor")
+        try:
+            contacts, next_cursor = contact_service.get_contacts_page(db, limit, cursor, sort)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        contacts = contact_service.get_contacts(db, skip, limit, sort)
+        next_cursor = contact_service.next_page_cursor(contacts, limit, sort)
+    etag = collection_etag((contact.id, contact.version) for contact in contacts)
+    headers = {"ETag": etag, **({"X-Next-Cursor": next_cursor} if next_cursor else {})}
+    if count:
+        headers["X-Total-Count"] = str(contact_service.count_contacts(db, count))
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(contact_service.contacts_to_json(contacts), media_type="application/json", headers=headers)
+
+@router.get("/search", response_model=List[Contact])
+def search_contacts(
+    q: str = Query(..., min_length=1, max_length=100),
+    mode: Literal["prefix", "fuzzy", "fulltext"] = "prefix",
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Search contacts: "prefix" and "fuzzy" match name, email and phone,
+    "fulltext" matches words in the address.
+    """
+    return contact_service.search_contacts(db, q, mode, limit)
 
 @router.get("/{contact_id}", response_model=Contact)
-def read_contact(contact_id: int, db: Session = Depends(get_db)):
-    db_contact = contact_service.get_contact(db, contact_id)
+def read_contact(contact_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    db_contact = contact_service.get_contact_cached(db, contact_id)
     if db_contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
+    etag = contact_etag(contact_id, db_contact["version"])
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return db_contact
 
 @router.put("/{contact_id}", response_model=Contact)
-def update_contact(contact_id: int, contact: ContactCreate, db: Session = Depends(get_db)):
+def update_contact(
+    contact_id: int,
+    contact: ContactCreate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    try:
+        version = expected_version(if_match, contact_id)
+        db_contact = contact_service.update_contact(db, contact_id, contact, version)
+    except IntegrityError as e:
+        raise HTTPException(status_code=400, detail=str(e.statement))
+    except (ValueError, contact_service.StaleContactError):
+        raise HTTPException(status_code=412, detail="Contact was modified")
+    if db_contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    response.headers["ETag"] = contact_etag(contact_id, db_contact.version)
+    return db_contact
+
+@router.patch("/{contact_id}", response_model=Contact)
+def patch_contact(
+    contact_id: int,
+    contact: ContactUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Update only the fields present in the body. A body that changes nothing
+    leaves the contact, its version and its ETag untouched.
+    """
     try:
-        db_contact = contact_service.update_contact(db, contact_id, contact)
-        if db_contact is None:
-            raise HTTPException(status_code=404, detail="Contact not found")
-        return db_contact
+        version = expected_version(if_match, contact_id)
+        db_contact = contact_service.patch_contact(db, contact_id, contact, version)
     except IntegrityError as e:
         raise HTTPException(status_code=400, detail=str(e.statement))
+    except (ValueError, contact_service.StaleContactError):
+        raise HTTPException(status_code=412, detail="Contact was modified")
+    if db_contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    response.headers["ETag"] = contact_etag(contact_id, db_contact.version)
+    return db_contact
 
 @router.delete("/{contact_id}", response_model=Contact)
-def delete_contact(contact_id: int, db: Session = Depends(get_db)):
-    db_contact = contact_service.delete_contact(db, contact_id)
+def delete_contact(contact_id: int, if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        version = expected_version(if_match, contact_id)
+        db_contact = contact_service.delete_contact(db, contact_id, version)
+    except (ValueError, contact_service.StaleContactError):
+        raise HTTPException(status_code=412, detail="Contact was modified")
     if db_contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
-    return db_contact
\ No newline at end of file
+    return db_contact
@@ -0,0 +1,128 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from app.core.etag import collection_etag, contact_etag, etag_matches, expected_version
+from app.db.session import get_async_db
+from app.schemas.contact import Contact, ContactCreate, ContactUpdate
+from app.services import contact_async as contact_service
+from app.services.contact import contacts_to_json
+
+from typing import List, Literal, Optional
+
+router = APIRouter()
+
+@router.post("/", response_model=Contact, status_code=201)
+async def create_contact(contact: ContactCreate, response: Response, db: AsyncSession = Depends(get_async_db)):
+    try:
+        db_contact = await contact_service.create_contact(db, contact)
+    except IntegrityError as e:
+        raise HTTPException(status_code=400, detail=str(e.statement))
+    response.headers["ETag"] = contact_etag(db_contact.id, db_contact.version)
+    return db_contact
+
+# Rows are serialized straight to JSON, so response_model only documents the shape.
+@router.get("/", response_model=List[Contact])
+async def read_contacts(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    sort: Literal["id", "name"] = "id",
+    count: Optional[Literal["exact", "estimated", "counter"]] = Query(
+        None, description="Also return the total number of contacts in X-Total-Count, counted with this strategy"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if cursor:
+        if skip:
+            raise HTTPException(status_code=400, detail="skip cannot be combined with cursor")
+        try:
+            contacts, next_cursor = await contact_service.get_contacts_page(db, limit, cursor, sort)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        contacts = await contact_service.get_contacts(db, skip, limit, sort)
+        next_cursor = contact_service.next_page_cursor(contacts, limit, sort)
+    etag = collection_etag((contact.id, contact.version) for contact in contacts)
+    headers = {"ETag": etag, **({"X-Next-Cursor": next_cursor} if next_cursor else {})}
+    if count:
+        headers["X-Total-Count"] = str(await contact_service.count_contacts(db, count))
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(contacts_to_json(contacts), media_type="application/json", headers=headers)
+
+@router.get("/{contact_id}", response_model=Contact)
+async def read_contact(contact_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    db_contact = await contact_service.get_contact_cached(db, contact_id)
+    if db_contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    etag = contact_etag(contact_id, db_contact["version"])
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return db_contact
+
+@router.put("/{contact_id}", response_model=Contact)
+async def update_contact(
+    contact_id: int,
+    contact: ContactCreate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        version = expected_version(if_match, contact_id)
+        db_contact = await contact_service.update_contact(db, contact_id, contact, version)
+    except IntegrityError as e:
+        raise HTTPException(status_code=400, detail=str(e.statement))
+    except (ValueError, contact_service.StaleContactError):
+        raise HTTPException(status_code=412, detail="Contact was modified")
+    if db_contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    response.headers["ETag"] = contact_etag(contact_id, db_contact.version)
+    return db_contact
+
+@router.patch("/{contact_id}", response_model=Contact)
+async def patch_contact(
+    contact_id: int,
+    contact: ContactUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        version = expected_version(if_match, contact_id)
+        db_contact = await contact_service.patch_contact(db, contact_id, contact, version)
+    except IntegrityError as e:
+        raise HTTPException(status_code=400, detail=str(e.statement))
+    except (ValueError, contact_service.StaleContactError):
+        raise HTTPException(status_code=412, detail="Contact was modified")
+    if db_contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    response.headers["ETag"] = contact_etag(contact_id, db_contact.version)
+    return db_contact
+
+@router.delete("/{contact_id}", response_model=Contact)
+async def delete_contact(contact_id: int, if_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    try:
+        version = expected_version(if_match, contact_id)
+        db_contact = await contact_service.delete_contact(db, contact_id, version)
+    except (ValueError, contact_service.StaleContactError):
+        raise HTTPException(status_code=412, detail="Contact was modified")
+    if db_contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return db_contact
+
+def with_async_routes(sync_router: APIRouter) -> APIRouter:
+    """
+    Return a copy of sync_router where every route that has an async
+    counterpart in this module is replaced by it. Route order is kept, so
+    static paths registered before "/{contact_id}" still match first.
+    """
+    overrides = {(route.path, frozenset(route.methods)): route for route in router.routes}
+    merged = APIRouter()
+    merged.routes.extend(
+        overrides.get((route.path, frozenset(route.methods)), route) for route in sync_router.routes
+    )
+    return merged
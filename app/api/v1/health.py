@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+
+router = APIRouter()
+
+@router.get("/live")
+def read_liveness():
+    """
+    The process is up and serving requests; does not touch the database.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+def read_readiness(db: Session = Depends(get_db)):
+    """
+    The database answers, so the instance can take traffic. Fails fast with
+    503 after DB_CONNECT_TIMEOUT when it does not.
+    """
+    try:
+        db.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return {"status": "ready"}
@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.admission import admission_metrics
+from app.core.timing import route_metrics
+from app.db import session
+from app.services.contact import contact_cache
+
+router = APIRouter()
+
+@router.get("/pool")
+def read_pool_metrics():
+    """
+    Connection pool occupancy and checkout telemetry for each engine.
+    """
+    session.init_engines()
+    pools = {
+        "sync": session.pool_metrics.snapshot(session.engine.pool),
+        "idempotency": session.idempotency_pool_metrics.snapshot(session.idempotency_engine.pool),
+    }
+    if session.async_engine is not None:
+        pools["async"] = session.async_pool_metrics.snapshot(session.async_engine.pool)
+    for index, replica in enumerate(session.replica_router.replicas):
+        pools[f"replica-{index}"] = {**replica.metrics.snapshot(replica.engine.pool), "available": replica.available}
+    return pools
+
+@router.get("/cache")
+def read_cache_metrics():
+    """
+    Hit, miss and eviction counters of the contact cache.
+    """
+    return {"backend": type(contact_cache).__name__, **contact_cache.stats.snapshot()}
+
+@router.get("/admission")
+def read_admission_metrics():
+    """
+    Requests admitted, rate limited and shed by the admission gate, and its
+    current occupancy.
+    """
+    return admission_metrics.snapshot(session.admission_gate)
+
+@router.get("/requests", response_class=PlainTextResponse)
+def read_request_metrics():
+    """
+    Per-route histograms of request duration, database time and SQL statement
+    count, in the Prometheus text format.
+    """
+    return route_metrics.render_prometheus()
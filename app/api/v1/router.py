@@ -1,5 +1,13 @@
 from fastapi import APIRouter
-from app.api.v1 import contacts
+from app.api.v1 import contacts, contacts_async, health, metrics
+from app.core.config import settings
 
 api_router = APIRouter()
-api_router.include_router(contacts.router, prefix="/contacts", tags=["contacts"])
\ No newline at end of file
+
+contacts_router = contacts.router
+if settings.USE_ASYNC_DB:
+    contacts_router = contacts_async.with_async_routes(contacts.router)
+
+api_router.include_router(contacts_router, prefix="/contacts", tags=["contacts"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(health.router, prefix="/health", tags=["health"])
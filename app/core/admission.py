@@ -0,0 +1,263 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Iterable, List, Optional
+
+import orjson
+
+from app.core.metrics import Counter
+
+API_KEY_HEADER = b"x-api-key"
+
+
+class NullRateLimiter:
+    """
+    Rate limiter that admits everything, used when rate limiting is disabled.
+    """
+
+    def acquire(self, client: str) -> float:
+        return 0.0
+
+
+class TokenBucketLimiter:
+    """
+    In-process token bucket per client: each client may burst up to burst
+    requests, refilled at rate per second. Limits apply per worker.
+
+    Buckets of the least recently seen clients are dropped past max_clients;
+    a forgotten client starts again with a full bucket, which it would have
+    refilled to by then anyway.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client: str) -> float:
+        """
+        Take a token for client. Returns 0 if the request is allowed, or the
+        seconds until the client has a token again.
+        """
+        with self._lock:
+            now = self._clock()
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+def build_rate_limiter(backend: str, rate: float, burst: float):
+    if backend == "none":
+        return NullRateLimiter()
+    if backend == "memory":
+        return TokenBucketLimiter(rate, burst)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+# Outcomes of AdmissionGate.acquire().
+ADMITTED = "admitted"
+QUEUE_FULL = "queue_full"
+TIMED_OUT = "timed_out"
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionGate:
+    """
+    Caps the requests doing database work at max_in_flight. Further requests
+    wait in a FIFO queue of at most max_queue for up to queue_timeout seconds,
+    and are turned away beyond that, so overload fails fast instead of piling
+    up on the connection pool.
+
+    A released slot is handed directly to the oldest waiter. Waiters may run
+    on different event loops, as under the test client.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: "deque[tuple]" = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> str:
+        """
+        Wait for a slot. Returns ADMITTED, after which the caller must call
+        release(), or QUEUE_FULL or TIMED_OUT.
+        """
+        with self._lock:
+            if self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+                return ADMITTED
+            if len(self._waiters) >= self.max_queue:
+                return QUEUE_FULL
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter[1]), self.queue_timeout)
+            return ADMITTED
+        except BaseException as e:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    owned = False
+                except ValueError:
+                    # release() handed the slot over just as the wait ended.
+                    owned = True
+            if isinstance(e, asyncio.TimeoutError):
+                return ADMITTED if owned else TIMED_OUT
+            if owned:
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                loop, future = self._waiters.popleft()
+                loop.call_soon_threadsafe(_wake, future)
+            else:
+                self.in_flight -= 1
+
+
+class AdmissionMetrics:
+    def __init__(self):
+        self.admitted = Counter()
+        self.rate_limited = Counter()
+        self.shed_queue_full = Counter()
+        self.shed_timeout = Counter()
+
+    def snapshot(self, gate: AdmissionGate) -> dict:
+        return {
+            "admitted": self.admitted.value,
+            "rate_limited": self.rate_limited.value,
+            "shed_queue_full": self.shed_queue_full.value,
+            "shed_timeout": self.shed_timeout.value,
+            "in_flight": gate.in_flight,
+            "queued": gate.queued,
+            "max_in_flight": gate.max_in_flight,
+            "max_queue": gate.max_queue,
+        }
+
+
+admission_metrics = AdmissionMetrics()
+
+
+class ClientIdentifier:
+    """
+    Who a request is rate limited as. By default its IP address, which behind
+    a proxy comes from X-Forwarded-For via uvicorn's proxy_headers.
+
+    The X-API-Key header is used instead only when it can be trusted: when it
+    is one of api_keys, or when trust_api_key_header says the proxy in front
+    has authenticated it. Otherwise a client could dodge its limit with a new
+    key per request, or spend another client's quota with theirs.
+    """
+
+    def __init__(self, api_keys: Iterable[str] = (), trust_api_key_header: bool = False):
+        self.api_keys = frozenset(api_keys)
+        self.trust_api_key_header = trust_api_key_header
+
+    def api_key(self, scope) -> Optional[str]:
+        """
+        The request's X-API-Key if it is trusted, else None.
+        """
+        api_key = dict(scope["headers"]).get(API_KEY_HEADER)
+        if api_key:
+            api_key = api_key.decode("latin-1")
+            if self.trust_api_key_header or api_key in self.api_keys:
+                return api_key
+        return None
+
+    def __call__(self, scope) -> str:
+        api_key = self.api_key(scope)
+        if api_key is not None:
+            return "key:" + api_key
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+
+def parse_api_keys(value: str) -> List[str]:
+    return [key.strip() for key in value.split(",") if key.strip()]
+
+
+async def _reject(send, status: int, detail: str, retry_after: float):
+    body = orjson.dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying the per-client rate limit, then the admission
+    gate, to requests under path_prefixes. Rate limited clients get 429 and
+    requests shed by the gate 503, both with Retry-After; the counts are in
+    admission_metrics.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter,
+        gate: AdmissionGate,
+        path_prefixes: Iterable[str],
+        metrics: AdmissionMetrics = admission_metrics,
+        client_id: Optional[ClientIdentifier] = None,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.gate = gate
+        self.path_prefixes = tuple(path_prefixes)
+        self.metrics = metrics
+        self.client_id = client_id or ClientIdentifier()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            return await self.app(scope, receive, send)
+
+        wait = self.limiter.acquire(self.client_id(scope))
+        if wait:
+            self.metrics.rate_limited.inc()
+            return await _reject(send, 429, "Too many requests", wait)
+
+        outcome = await self.gate.acquire()
+        if outcome != ADMITTED:
+            (self.metrics.shed_queue_full if outcome == QUEUE_FULL else self.metrics.shed_timeout).inc()
+            return await _reject(send, 503, "Server is overloaded, retry later", self.gate.queue_timeout)
+        self.metrics.admitted.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gate.release()
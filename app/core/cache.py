@@ -0,0 +1,183 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from app.core.metrics import Counter
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = Counter()
+
+    def snapshot(self) -> dict:
+        lookups = self.hits.value + self.misses.value
+        return {
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+            "evictions": self.evictions.value,
+            "hit_ratio": self.hits.value / lookups if lookups else 0.0,
+        }
+
+
+class NullCache:
+    """
+    Cache that stores nothing, used when caching is disabled.
+    """
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[Any]:
+        self.stats.misses.inc()
+        return None
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def delete(self, key: str):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache:
+    """
+    In-process least-recently-used cache whose entries also expire after a TTL.
+    Evictions count entries dropped for capacity or because they expired.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.stats.evictions.inc()
+                entry = None
+            if entry is None:
+                self.stats.misses.inc()
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits.inc()
+            return entry[1]
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions.inc()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TTLCounter:
+    """
+    In-process count that is loaded from an authoritative source, adjusted in
+    place by local writes and reloaded once it is older than the TTL, which
+    bounds the drift from writes made by other processes.
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._value: Optional[int] = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def value(self) -> Optional[int]:
+        """
+        Return the count, or None when it has to be reloaded with reset().
+        """
+        with self._lock:
+            if self._value is None or self._expires <= self._clock():
+                return None
+            return self._value
+
+    def reset(self, value: int):
+        with self._lock:
+            self._value = value
+            self._expires = self._clock() + self.ttl
+
+    def adjust(self, delta: int):
+        with self._lock:
+            if self._value is not None:
+                self._value += delta
+
+    def clear(self):
+        with self._lock:
+            self._value = None
+
+
+class RedisCache:
+    """
+    Cache shared by every worker, stored in Redis as JSON with a TTL. Expiry
+    and evictions happen inside Redis, so only hits and misses are counted.
+
+    client is any object with the get/set(ex=)/delete/scan_iter methods of
+    redis.Redis, which lets tests pass a local stand-in.
+    """
+
+    def __init__(self, client, ttl: float, prefix: str = "contacts:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    @classmethod
+    def from_url(cls, url: str, ttl: float) -> "RedisCache":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package: pip install redis") from e
+        return cls(redis.Redis.from_url(url), ttl)
+
+    def get(self, key: str) -> Optional[Any]:
+        data = self.client.get(self.prefix + key)
+        if data is None:
+            self.stats.misses.inc()
+            return None
+        self.stats.hits.inc()
+        return json.loads(data)
+
+    def set(self, key: str, value: Any):
+        self.client.set(self.prefix + key, json.dumps(value, default=str), ex=max(int(self.ttl), 1))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+def build_cache(backend: str, ttl: float, max_entries: int, redis_url: Optional[str] = None):
+    if backend == "none":
+        return NullCache()
+    if backend == "redis":
+        return RedisCache.from_url(redis_url, ttl)
+    if backend == "memory":
+        return LRUCache(max_entries, ttl)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
@@ -15,9 +16,94 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT")
     
     API_PORT: str = os.getenv("API_PORT", 8000)
+
+    # Worker processes of the production server (app/server.py), 0 for one per
+    # CPU, and seconds in-flight requests get to finish on shutdown.
+    WEB_WORKERS: int = os.getenv("WEB_WORKERS", "0")
+    GRACEFUL_SHUTDOWN_SECONDS: int = os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "30")
     
     DATABASE_URL: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
+    # Comma-separated read replica URLs for GET routes; empty reads from the primary.
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    # Seconds reads stay on the primary after a client's write, and before a
+    # replica that failed to connect is tried again.
+    READ_YOUR_WRITES_SECONDS: float = os.getenv("READ_YOUR_WRITES_SECONDS", "5")
+    REPLICA_RETRY_SECONDS: float = os.getenv("REPLICA_RETRY_SECONDS", "30")
+
+    # Connection pool sizing, per process. DB_POOL_RECYCLE=-1 keeps connections forever.
+    DB_POOL_SIZE: int = os.getenv("DB_POOL_SIZE", "5")
+    DB_MAX_OVERFLOW: int = os.getenv("DB_MAX_OVERFLOW", "10")
+    DB_POOL_TIMEOUT: float = os.getenv("DB_POOL_TIMEOUT", "30")
+    DB_POOL_RECYCLE: int = os.getenv("DB_POOL_RECYCLE", "1800")
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true")
+    # Seconds to wait for a new database connection before giving up.
+    DB_CONNECT_TIMEOUT: int = os.getenv("DB_CONNECT_TIMEOUT", "5")
+
+    # Rows validated and inserted per statement by the bulk import endpoint.
+    IMPORT_BATCH_SIZE: int = os.getenv("IMPORT_BATCH_SIZE", "2000")
+
+    # Deduplication: country code given to 10-digit national phone numbers when
+    # normalizing, rows read per batch, lowest pair score suggested for a merge,
+    # and largest group of contacts sharing a key that is compared pairwise.
+    DEFAULT_PHONE_COUNTRY_CODE: str = os.getenv("DEFAULT_PHONE_COUNTRY_CODE", "1")
+    DEDUP_BATCH_SIZE: int = os.getenv("DEDUP_BATCH_SIZE", "10000")
+    DEDUP_MIN_SCORE: float = os.getenv("DEDUP_MIN_SCORE", "0.45")
+    DEDUP_MAX_BLOCK_SIZE: int = os.getenv("DEDUP_MAX_BLOCK_SIZE", "50")
+
+    # Days deleted contacts are kept as tombstones for the change feed, and
+    # seconds the feed holds back the newest changes while their transactions settle.
+    TOMBSTONE_RETENTION_DAYS: float = os.getenv("TOMBSTONE_RETENTION_DAYS", "30")
+    CHANGE_FEED_LAG_SECONDS: float = os.getenv("CHANGE_FEED_LAG_SECONDS", "2")
+
+    # Per-client token bucket on the contact routes, keyed by IP: "memory" (per
+    # worker) or "none". RATE_LIMIT_PER_SECOND refills up to RATE_LIMIT_BURST requests.
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "none")
+    RATE_LIMIT_PER_SECOND: float = os.getenv("RATE_LIMIT_PER_SECOND", "20")
+    RATE_LIMIT_BURST: float = os.getenv("RATE_LIMIT_BURST", "40")
+    # Clients are keyed by their X-API-Key instead when it is one of API_KEYS
+    # (comma-separated), or any key when TRUST_API_KEY_HEADER says the proxy in
+    # front has authenticated it. Idempotency-Key values are then scoped to the
+    # API key too; without one they are shared by every client.
+    API_KEYS: str = os.getenv("API_KEYS", "")
+    TRUST_API_KEY_HEADER: bool = os.getenv("TRUST_API_KEY_HEADER", "false")
+
+    # Contact requests served at once per worker (0: DB_POOL_SIZE +
+    # DB_MAX_OVERFLOW); up to ADMISSION_MAX_QUEUE more wait for up to
+    # ADMISSION_QUEUE_TIMEOUT_SECONDS, and the rest get 503.
+    ADMISSION_MAX_IN_FLIGHT: int = os.getenv("ADMISSION_MAX_IN_FLIGHT", "0")
+    ADMISSION_MAX_QUEUE: int = os.getenv("ADMISSION_MAX_QUEUE", "50")
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "2")
+
+    # Idempotency-Key support for POST /contacts: "database" (shared by every
+    # worker), "memory" (per worker) or "none". Keys are kept for the TTL;
+    # retries wait up to IDEMPOTENCY_WAIT_SECONDS for the first request, and a
+    # first request still unfinished after IDEMPOTENCY_LEASE_SECONDS is
+    # assumed lost.
+    IDEMPOTENCY_BACKEND: str = os.getenv("IDEMPOTENCY_BACKEND", "database")
+    IDEMPOTENCY_TTL_SECONDS: float = os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")
+    IDEMPOTENCY_WAIT_SECONDS: float = os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10")
+    IDEMPOTENCY_LEASE_SECONDS: float = os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60")
+    # Connections of the idempotency store's own pool, per process, outside
+    # the DB_POOL_SIZE + DB_MAX_OVERFLOW that the admission gate accounts for.
+    IDEMPOTENCY_POOL_SIZE: int = os.getenv("IDEMPOTENCY_POOL_SIZE", "2")
+
+    # Read-through cache for single contacts: "memory" (per process), "redis" or "none".
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_TTL_SECONDS: float = os.getenv("CACHE_TTL_SECONDS", "60")
+    CACHE_MAX_ENTRIES: int = os.getenv("CACHE_MAX_ENTRIES", "10000")
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
+
+    # Seconds the maintained contact count is trusted before it is recounted.
+    COUNT_CACHE_TTL_SECONDS: float = os.getenv("COUNT_CACHE_TTL_SECONDS", "30")
+
+    # Serve the contact CRUD routes from async handlers on an asyncpg engine
+    # instead of sync handlers on the threadpool.
+    USE_ASYNC_DB: bool = os.getenv("USE_ASYNC_DB", "false")
+
+    # Requests slower than this are logged together with their SQL.
+    SLOW_REQUEST_MS: float = os.getenv("SLOW_REQUEST_MS", "500")
+
     model_config = SettingsConfigDict(env_file=".env")
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,55 @@
+import hashlib
+from typing import Iterable, Optional, Tuple
+
+
+def contact_etag(contact_id: int, version: int) -> str:
+    """
+    Strong ETag of a contact: the row version changes on every write.
+    """
+    return f'"{contact_id}.{version}"'
+
+
+def collection_etag(keys: Iterable[Tuple[int, int]]) -> str:
+    """
+    Weak ETag of a list response, derived from the (id, version) of its rows.
+    """
+    digest = hashlib.sha1()
+    for contact_id, version in keys:
+        digest.update(f"{contact_id}.{version};".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _split_etags(header: str) -> list:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against the current ETag.
+    """
+    if not if_none_match:
+        return False
+    tags = _split_etags(if_none_match)
+    return "*" in tags or etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
+
+
+def expected_version(if_match: Optional[str], contact_id: int) -> Optional[int]:
+    """
+    Row version a write must match according to the If-Match header, or None
+    when the write is unconditional ("*" or no header).
+
+    Raises ValueError if none of the ETags can refer to this contact; the
+    write must then fail its precondition.
+    """
+    if not if_match:
+        return None
+    tags = _split_etags(if_match)
+    if "*" in tags:
+        return None
+    for tag in tags:
+        if tag.startswith("W/"):
+            continue  # If-Match requires strong comparison
+        owner, _, version = tag.strip('"').partition(".")
+        if owner == str(contact_id) and version.isdigit():
+            return int(version)
+    raise ValueError("If-Match does not match the contact")
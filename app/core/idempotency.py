@@ -0,0 +1,267 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import anyio
+import orjson
+
+from app.core.admission import ClientIdentifier
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+# Statuses saying the request was not handled yet and may succeed on retry,
+# such as a 429 from the rate limiter: the key is released rather than stored.
+RETRYABLE_STATUSES = frozenset({408, 409, 425, 429})
+
+
+@dataclass
+class IdempotencyRecord:
+    """
+    What is stored under an idempotency key: the fingerprint of the request
+    that first used it and, once that request has finished, its response.
+    """
+
+    fingerprint: str
+    # None while the first request is still being served.
+    status: Optional[int] = None
+    headers: List[Tuple[str, str]] = field(default_factory=list)
+    body: bytes = b""
+
+    @property
+    def in_flight(self) -> bool:
+        return self.status is None
+
+
+class NullIdempotencyStore:
+    """
+    Store that keeps nothing, used when idempotency keys are disabled: every
+    request is served as if it were the first.
+    """
+
+    def reserve(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        return None
+
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        return None
+
+    def complete(self, key: str, status: int, headers: List[Tuple[str, str]], body: bytes):
+        pass
+
+    def release(self, key: str):
+        pass
+
+    def clear(self):
+        pass
+
+
+class MemoryIdempotencyStore:
+    """
+    In-process store whose keys expire ttl seconds after their first request.
+    Only requests served by the same worker are deduplicated.
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        # Insertion ordered, and every key lives for the same ttl, so the
+        # entries expire front to back.
+        self._records: "dict[str, tuple]" = {}
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        now = self._clock()
+        while self._records:
+            key = next(iter(self._records))
+            if self._records[key][0] > now:
+                break
+            del self._records[key]
+
+    def reserve(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        """
+        Claim key for a request with this fingerprint. Returns None if the
+        caller now owns the key, or the record of the request that owns it.
+        """
+        with self._lock:
+            self._expire()
+            entry = self._records.get(key)
+            if entry is not None:
+                return entry[1]
+            self._records[key] = (self._clock() + self.ttl, IdempotencyRecord(fingerprint))
+            return None
+
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        with self._lock:
+            self._expire()
+            entry = self._records.get(key)
+            return entry[1] if entry is not None else None
+
+    def complete(self, key: str, status: int, headers: List[Tuple[str, str]], body: bytes):
+        with self._lock:
+            entry = self._records.get(key)
+            if entry is not None:
+                record = IdempotencyRecord(entry[1].fingerprint, status, headers, body)
+                self._records[key] = (entry[0], record)
+
+    def release(self, key: str):
+        with self._lock:
+            self._records.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def __len__(self):
+        return len(self._records)
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    """
+    Hash of a request, so a key reused for a different request is detected.
+    JSON bodies are compared by content, not by formatting or key order.
+    """
+    try:
+        body = orjson.dumps(json.loads(body), option=orjson.OPT_SORT_KEYS)
+    except ValueError:
+        pass
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+async def _send_json(send, status: int, detail: str, headers: Iterable[Tuple[bytes, bytes]] = ()):
+    body = orjson.dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware making POSTs to paths safe to retry with an
+    Idempotency-Key header.
+
+    The first request with a key is served and its response stored; later
+    requests with the same key and body get that response replayed, with an
+    Idempotent-Replayed header, without reaching the route. Requests arriving
+    while the first is still being served wait up to wait_seconds for its
+    response, polling the store with exponential backoff from poll_seconds
+    up to max_poll_seconds, so a burst of retries results in a single write,
+    and get 409 after that. Reusing a key for a different request is
+    rejected with 422. Responses with a 5xx or RETRYABLE_STATUSES status, and
+    requests that raise, are not stored, so they can be retried.
+
+    Keys sent with an API key that client_id trusts are scoped to that API
+    key, so such clients never share responses. Other keys are shared by
+    every client: scoping them to an IP address would break retries from a
+    new address, and behind a proxy would not separate clients anyway.
+
+    Store calls run in a worker thread, as the store may do blocking I/O.
+    """
+
+    def __init__(
+        self,
+        app,
+        store,
+        paths: Iterable[str],
+        wait_seconds: float = 10,
+        poll_seconds: float = 0.05,
+        max_poll_seconds: float = 1,
+        client_id: Optional[ClientIdentifier] = None,
+    ):
+        self.app = app
+        self.store = store
+        self.paths = frozenset(paths)
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+        self.max_poll_seconds = max_poll_seconds
+        self.client_id = client_id or ClientIdentifier()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+        key = dict(scope["headers"]).get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return await self.app(scope, receive, send)
+        key = key.decode("latin-1")
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return await _send_json(send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+
+        body = b""
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        fingerprint = request_fingerprint(scope["method"], scope["path"], body)
+        api_key = self.client_id.api_key(scope)
+        if api_key is not None:
+            key = f"key:{api_key}:{key}"
+
+        deadline = time.monotonic() + self.wait_seconds
+        poll = self.poll_seconds
+        record = await anyio.to_thread.run_sync(self.store.reserve, key, fingerprint)
+        while record is not None:
+            if record.fingerprint != fingerprint:
+                return await _send_json(send, 422, "Idempotency-Key was already used with a different request")
+            if not record.in_flight:
+                return await self._replay(record, send)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return await _send_json(
+                    send, 409, "A request with this Idempotency-Key is still in progress", [(b"retry-after", b"1")]
+                )
+            await anyio.sleep(min(poll, remaining))
+            poll = min(poll * 2, self.max_poll_seconds)
+            record = await anyio.to_thread.run_sync(self.store.get, key)
+            if record is None:
+                # The first request failed and gave the key up: serve this one.
+                record = await anyio.to_thread.run_sync(self.store.reserve, key, fingerprint)
+        await self._serve(scope, receive, send, key, body)
+
+    async def _replay(self, record: IdempotencyRecord, send):
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record.headers]
+        await send({"type": "http.response.start", "status": record.status, "headers": [*headers, (REPLAYED_HEADER, b"true")]})
+        await send({"type": "http.response.body", "body": record.body})
+
+    async def _serve(self, scope, receive, send, key: str, body: bytes):
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        response = {"status": None, "headers": [], "body": b""}
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    (name.decode("latin-1"), value.decode("latin-1")) for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_and_record)
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(self.store.release, key)
+            raise
+        status = response["status"]
+        if status is None or status >= 500 or status in RETRYABLE_STATUSES:
+            await anyio.to_thread.run_sync(self.store.release, key)
+        else:
+            await anyio.to_thread.run_sync(self.store.complete, key, status, response["headers"], response["body"])
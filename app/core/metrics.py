@@ -0,0 +1,53 @@
+import bisect
+import threading
+from typing import Optional, Sequence
+
+# Latency buckets in seconds, matching the Prometheus client defaults.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+class Counter:
+    """
+    Thread-safe monotonically increasing counter.
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """
+    Thread-safe cumulative histogram with fixed upper bounds, in the shape
+    Prometheus expects.
+    """
+
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        self.buckets = tuple(sorted(buckets or DEFAULT_BUCKETS))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {"count": running, "sum": total, "buckets": cumulative}
@@ -0,0 +1,49 @@
+import re
+import unicodedata
+from typing import Optional
+
+_NON_DIGITS = re.compile(r"\D")
+_NAME_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """
+    Case-insensitive form of an email address, without surrounding whitespace.
+    """
+    if email is None:
+        return None
+    return email.strip().lower() or None
+
+
+def normalize_phone(phone: Optional[str], default_country_code: str = "1") -> Optional[str]:
+    """
+    Best-effort E.164 form of a phone number: "+" followed by the digits.
+    Formatting characters are dropped, a leading "00" is read as "+", and
+    national numbers of 10 digits get default_country_code.
+    """
+    if phone is None:
+        return None
+    stripped = phone.strip()
+    digits = _NON_DIGITS.sub("", stripped)
+    if not digits:
+        return None
+    if stripped.startswith("+"):
+        return f"+{digits}"
+    if digits.startswith("00"):
+        return f"+{digits[2:]}"
+    if len(digits) == 10:
+        return f"+{default_country_code}{digits}"
+    return f"+{digits}"
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """
+    Accent-, case- and punctuation-insensitive form of a name with its words
+    sorted, so "José  Doe" and "doe, jose" normalize alike.
+    """
+    if name is None:
+        return None
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(char for char in decomposed if not unicodedata.combining(char))
+    words = _NAME_PUNCTUATION.sub(" ", ascii_name.casefold()).split()
+    return " ".join(sorted(words)) or None
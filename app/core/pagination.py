@@ -0,0 +1,26 @@
+import base64
+import json
+
+
+def encode_cursor(values: dict) -> str:
+    """
+    Encode the keyset position of the last row of a page as an opaque cursor.
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,150 @@
+import contextvars
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from starlette.routing import Match
+
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Buckets for the number of SQL statements run by a request.
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+# Statements kept per request for the slow request log.
+MAX_LOGGED_STATEMENTS = 50
+
+
+@dataclass
+class RequestTiming:
+    """
+    SQL statements and time spent in the database by the current request,
+    filled in by the engine event hooks.
+    """
+
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_seconds: float = 0.0
+    statements: List[str] = field(default_factory=list)
+
+    def record_query(self, statement: str, seconds: float):
+        self.queries += 1
+        self.db_seconds += seconds
+        if len(self.statements) < MAX_LOGGED_STATEMENTS:
+            self.statements.append(statement)
+
+    @property
+    def total_seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        total = self.total_seconds
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries", '
+            f"app;dur={(total - self.db_seconds) * 1000:.1f}, "
+            f"total;dur={total * 1000:.1f}"
+        )
+
+
+# The object is shared, not copied, by the tasks and threadpool workers that
+# serve a request, so queries run in any of them add up on the same timing.
+current_timing: contextvars.ContextVar[Optional[RequestTiming]] = contextvars.ContextVar(
+    "current_timing", default=None
+)
+
+
+class RouteMetrics:
+    """
+    Per-route histograms of request duration, database time and query count.
+    """
+
+    def __init__(self):
+        self.duration: Dict[str, Histogram] = {}
+        self.db_time: Dict[str, Histogram] = {}
+        self.queries: Dict[str, Histogram] = {}
+
+    def observe(self, route: str, timing: RequestTiming, total: float):
+        if route not in self.duration:
+            self.duration.setdefault(route, Histogram())
+            self.db_time.setdefault(route, Histogram())
+            self.queries.setdefault(route, Histogram(QUERY_COUNT_BUCKETS))
+        self.duration[route].observe(total)
+        self.db_time[route].observe(timing.db_seconds)
+        self.queries[route].observe(timing.queries)
+
+    def render_prometheus(self) -> str:
+        """
+        Render the histograms in the Prometheus text exposition format.
+        """
+        lines = []
+        families = (
+            ("http_request_duration_seconds", "Request duration by route", self.duration),
+            ("http_request_db_seconds", "Time spent in SQL statements by route", self.db_time),
+            ("http_request_queries", "SQL statements run per request by route", self.queries),
+        )
+        for name, description, histograms in families:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} histogram")
+            for route, histogram in sorted(histograms.items()):
+                snapshot = histogram.snapshot()
+                for bound, count in snapshot["buckets"].items():
+                    lines.append(f'{name}_bucket{{route="{route}",le="{bound}"}} {count}')
+                lines.append(f'{name}_sum{{route="{route}"}} {snapshot["sum"]}')
+                lines.append(f'{name}_count{{route="{route}"}} {snapshot["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+route_metrics = RouteMetrics()
+
+
+def route_template(scope) -> str:
+    # The path template ("/api/v1/contacts/{contact_id}") keeps the number of
+    # histograms bounded, unlike the raw path.
+    router = scope.get("router")
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return f'{scope["method"]} {route.path}'
+    return "unmatched"
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware recording query count, database time and total time per
+    request. Adds a Server-Timing header, logs requests slower than
+    slow_request_ms with their SQL, and feeds route_metrics.
+    """
+
+    def __init__(self, app, slow_request_ms: float):
+        self.app = app
+        self.slow_request_seconds = slow_request_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timing.reset(token)
+            total = timing.total_seconds
+            route = route_template(scope)
+            route_metrics.observe(route, timing, total)
+            if total >= self.slow_request_seconds:
+                logger.warning(
+                    "Slow request %s %s: %.1f ms, %d queries, %.1f ms in the database\n%s",
+                    scope["method"], scope["path"], total * 1000, timing.queries, timing.db_seconds * 1000,
+                    "\n".join(timing.statements),
+                )
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
-from app.models.contact import Contact
\ No newline at end of file
+from app.models.contact import Contact
+from app.models.idempotency import IdempotencyKey
\ No newline at end of file
@@ -0,0 +1,124 @@
+import datetime
+import json
+import threading
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.idempotency import IdempotencyRecord, MemoryIdempotencyStore, NullIdempotencyStore
+from app.models.contact import utcnow
+from app.models.idempotency import IdempotencyKey
+
+# Reservations between two purges of expired keys, per process.
+PURGE_EVERY = 1000
+
+
+class DatabaseIdempotencyStore:
+    """
+    Idempotency store in the idempotency_keys table, shared by every worker.
+
+    Each call uses its own short session from session_factory and commits
+    right away, so a reservation is visible to the other workers before the
+    request it belongs to is served. A reservation still in flight after
+    lease_seconds is taken to belong to a worker that died, and can be
+    claimed again.
+    """
+
+    def __init__(self, session_factory, ttl: float, lease_seconds: float = 60):
+        self.session_factory = session_factory
+        self.ttl = datetime.timedelta(seconds=ttl)
+        self.lease = datetime.timedelta(seconds=lease_seconds)
+        self._reservations = 0
+        self._lock = threading.Lock()
+
+    def _claim_values(self, fingerprint: str, now: datetime.datetime) -> dict:
+        return {
+            "fingerprint": fingerprint, "status": None, "headers": None, "body": None,
+            "created_at": now, "expires_at": now + self.ttl,
+        }
+
+    def reserve(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        """
+        Claim key for a request with this fingerprint. Returns None if the
+        caller now owns the key, or the record of the request that owns it.
+        """
+        self._purge_periodically()
+        while True:
+            now = utcnow()
+            with self.session_factory() as db:
+                try:
+                    db.execute(insert(IdempotencyKey).values(key=key, **self._claim_values(fingerprint, now)))
+                    db.commit()
+                    return None
+                except IntegrityError:
+                    db.rollback()
+                reclaimable = or_(
+                    IdempotencyKey.expires_at <= now,
+                    and_(IdempotencyKey.status.is_(None), IdempotencyKey.created_at <= now - self.lease),
+                )
+                claimed = db.execute(
+                    update(IdempotencyKey).where(IdempotencyKey.key == key, reclaimable)
+                    .values(**self._claim_values(fingerprint, now))
+                ).rowcount
+                db.commit()
+                if claimed:
+                    return None
+                record = self._get(db, key, now)
+            if record is not None:
+                return record
+            # Released between the insert and the read: try again.
+
+    def _get(self, db, key: str, now: datetime.datetime) -> Optional[IdempotencyRecord]:
+        row = db.execute(
+            select(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at > now)
+        ).scalar_one_or_none()
+        if row is None:
+            return None
+        headers = [tuple(header) for header in json.loads(row.headers)] if row.headers else []
+        return IdempotencyRecord(row.fingerprint, row.status, headers, row.body or b"")
+
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        with self.session_factory() as db:
+            return self._get(db, key, utcnow())
+
+    def complete(self, key: str, status: int, headers: List[Tuple[str, str]], body: bytes):
+        with self.session_factory() as db:
+            db.execute(
+                update(IdempotencyKey).where(IdempotencyKey.key == key)
+                .values(status=status, headers=json.dumps(headers), body=body)
+            )
+            db.commit()
+
+    def release(self, key: str):
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status.is_(None)))
+            db.commit()
+
+    def purge_expired(self) -> int:
+        with self.session_factory() as db:
+            purged = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= utcnow())).rowcount
+            db.commit()
+        return purged
+
+    def _purge_periodically(self):
+        with self._lock:
+            self._reservations += 1
+            due = self._reservations % PURGE_EVERY == 0
+        if due:
+            self.purge_expired()
+
+    def clear(self):
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey))
+            db.commit()
+
+
+def build_idempotency_store(backend: str, ttl: float, lease_seconds: float, session_factory=None):
+    if backend == "none":
+        return NullIdempotencyStore()
+    if backend == "database":
+        return DatabaseIdempotencyStore(session_factory, ttl, lease_seconds)
+    if backend == "memory":
+        return MemoryIdempotencyStore(ttl)
+    raise ValueError(f"Unknown idempotency backend: {backend}")
@@ -0,0 +1,97 @@
+import time
+from typing import Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+
+# Checkout latency buckets in seconds; most checkouts should land in the first one.
+CHECKOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class PoolMetrics:
+    """
+    Checkout telemetry for one connection pool.
+
+    A checkout "waits" when no idle connection was available and the caller
+    had to open a new one or block until another request returned one.
+    """
+
+    def __init__(self):
+        self.checkouts = Counter()
+        self.waits = Counter()
+        self.wait_seconds = Counter()
+        self.timeouts = Counter()
+        self.checkout_latency = Histogram(CHECKOUT_BUCKETS)
+
+    def snapshot(self, pool) -> dict:
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": self.checkouts.value,
+            "waits": self.waits.value,
+            "wait_seconds": self.wait_seconds.value,
+            "timeouts": self.timeouts.value,
+            "checkout_latency_seconds": self.checkout_latency.snapshot(),
+        }
+
+
+def instrumented_pool_class(base: type, metrics: PoolMetrics) -> type:
+    """
+    Subclass a queue pool so every checkout is timed into metrics. The
+    metrics live outside the pool so they survive engine.dispose(), which
+    recreates the pool from its class.
+    """
+
+    class InstrumentedPool(base):
+        def _do_get(self):
+            idle = self.checkedin()
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                metrics.timeouts.inc()
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                metrics.checkouts.inc()
+                metrics.checkout_latency.observe(elapsed)
+                if not idle:
+                    metrics.waits.inc()
+                    metrics.wait_seconds.inc(elapsed)
+
+    InstrumentedPool.__name__ = InstrumentedPool.__qualname__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def engine_options(
+    url: str,
+    metrics: PoolMetrics,
+    is_async: bool = False,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+) -> dict:
+    """
+    Pool keyword arguments for create_engine built from the DB_POOL_* settings,
+    or pool_size and max_overflow when given. SQLite keeps its default pool
+    since sizing does not apply to it.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    # asyncpg and psycopg2 name the connect timeout differently.
+    connect_args = {"timeout": settings.DB_CONNECT_TIMEOUT} if is_async else {"connect_timeout": settings.DB_CONNECT_TIMEOUT}
+    return {
+        "connect_args": connect_args,
+        "poolclass": instrumented_pool_class(base, metrics),
+        "pool_size": settings.DB_POOL_SIZE if pool_size is None else pool_size,
+        "max_overflow": settings.DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
@@ -0,0 +1,119 @@
+import itertools
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.pool import PoolMetrics, engine_options
+
+# Cookie set after a write so the client's next reads go to the primary.
+STICKY_COOKIE = "read_primary"
+
+# Header a client sends to read from the primary regardless of the cookie.
+READ_PRIMARY_HEADER = "x-read-primary"
+
+
+def parse_replica_urls(value: Optional[str]) -> List[str]:
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.metrics = PoolMetrics()
+        self.engine: Engine = create_engine(url, **engine_options(url, self.metrics))
+        # Monotonic time until which the replica is skipped after a failed connect.
+        self.down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+
+class ReplicaRouter:
+    """
+    Hands out sessions on read replicas in round-robin order.
+
+    A replica that cannot be connected to is skipped for retry_seconds, and
+    when none is reachable the caller falls back to the primary.
+    """
+
+    def __init__(self, urls: List[str], retry_seconds: float = 30):
+        self.replicas = [Replica(url) for url in urls]
+        self.retry_seconds = retry_seconds
+        self._order = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._lock = threading.Lock()
+        self._sessionmaker = sessionmaker(autocommit=False, autoflush=False)
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def _next_replicas(self) -> List[Replica]:
+        with self._lock:
+            start = next(self._order)
+        count = len(self.replicas)
+        return [self.replicas[(start + offset) % count] for offset in range(count)]
+
+    def session(self) -> Optional[Session]:
+        """
+        Open a session on the next reachable replica, or return None if every
+        replica is down.
+        """
+        for replica in self._next_replicas():
+            if not replica.available:
+                continue
+            db = self._sessionmaker(bind=replica.engine)
+            try:
+                # Check out the connection now, so an unreachable replica is
+                # detected here rather than by the first query of the handler.
+                db.connection()
+            except DBAPIError:
+                db.close()
+                replica.down_until = time.monotonic() + self.retry_seconds
+                continue
+            return db
+        return None
+
+    def dispose(self):
+        for replica in self.replicas:
+            replica.engine.dispose()
+
+
+def reads_from_primary(request) -> bool:
+    """
+    Whether the client asked to read its own writes, with READ_PRIMARY_HEADER
+    or the cookie set after its last write.
+    """
+    header = request.headers.get(READ_PRIMARY_HEADER, "").lower()
+    return header in ("1", "true", "yes") or STICKY_COOKIE in request.cookies
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware setting STICKY_COOKIE on successful writes, for
+    sticky_seconds, so that get_read_db sends the client's next reads to the
+    primary and they see their own writes despite replication lag.
+
+    Requests served by get_read_db are reads whatever their method, such as
+    the POST of a batch get, and do not set the cookie.
+    """
+
+    def __init__(self, app, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            return await self.app(scope, receive, send)
+
+        async def send_with_cookie(message):
+            read_only = scope.get("state", {}).get("read_only")
+            if message["type"] == "http.response.start" and message["status"] < 400 and not read_only:
+                cookie = f"{STICKY_COOKIE}=1; Max-Age={int(self.sticky_seconds)}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
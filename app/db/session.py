@@ -1,13 +1,165 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import os
+import threading
+import time
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.admission import AdmissionGate
 from app.core.config import settings
+from app.core.timing import current_timing
+from app.db.pool import PoolMetrics, engine_options
+from app.db.replicas import ReplicaRouter, parse_replica_urls, reads_from_primary
+
+# Async drivers used in place of the sync driver of DATABASE_URL.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS[parsed.get_backend_name()]).render_as_string(hide_password=False)
+
+# Registered on the Engine class so every engine, including the sync engine
+# behind async_engine, reports its statements to the request being served.
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    timing = current_timing.get()
+    if timing is not None:
+        timing.record_query(statement, elapsed)
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(exception_context):
+    # A failed statement never reaches after_cursor_execute.
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+idempotency_pool_metrics = PoolMetrics()
+
+# Bounds the requests doing database work at once in this worker, by default
+# to what the primary pool can serve without waiting (see AdmissionMiddleware).
+admission_gate = AdmissionGate(
+    settings.ADMISSION_MAX_IN_FLIGHT or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    settings.ADMISSION_MAX_QUEUE,
+    settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+)
+
+# Created by init_engines(), from the application lifespan or on first use, so
+# importing the app neither builds engines nor loads database drivers.
+engine = None
+async_engine = None
+# The idempotency store runs outside the admission gate, so it gets a pool of
+# its own rather than taking connections the gate counts on.
+idempotency_engine = None
+replica_router = ReplicaRouter([])
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+IdempotencySessionLocal = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+_init_lock = threading.Lock()
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def init_engines():
+    """
+    Create the primary, replica, async and idempotency engines from the
+    settings, once. Engines connect lazily, so this does not wait for the
+    database.
+    """
+    global engine, async_engine, idempotency_engine, replica_router
+    with _init_lock:
+        if engine is not None:
+            return
+        replica_router = ReplicaRouter(parse_replica_urls(settings.DATABASE_REPLICA_URLS), settings.REPLICA_RETRY_SECONDS)
+        if settings.USE_ASYNC_DB:
+            async_url = to_async_url(settings.DATABASE_URL)
+            async_engine = create_async_engine(async_url, **engine_options(async_url, async_pool_metrics, is_async=True))
+            AsyncSessionLocal.configure(bind=async_engine)
+        idempotency_engine = create_engine(
+            settings.DATABASE_URL,
+            **engine_options(
+                settings.DATABASE_URL, idempotency_pool_metrics, pool_size=settings.IDEMPOTENCY_POOL_SIZE, max_overflow=0
+            ),
+        )
+        IdempotencySessionLocal.configure(bind=idempotency_engine)
+        sync_engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, pool_metrics))
+        SessionLocal.configure(bind=sync_engine)
+        engine = sync_engine
+
+def _reset_pools_after_fork():
+    # A forked worker must not share the parent's pooled connections.
+    # close=False leaves them to the parent and gives the child empty pools.
+    if engine is not None:
+        engine.dispose(close=False)
+        idempotency_engine.dispose(close=False)
+    for replica in replica_router.replicas:
+        replica.engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+async def dispose_engines():
+    """
+    Close every pooled connection, on shutdown once requests have drained.
+    """
+    if engine is not None:
+        engine.dispose()
+        idempotency_engine.dispose()
+    replica_router.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+def new_session() -> Session:
+    """
+    Session on the primary, creating the engines on first use.
+    """
+    if engine is None:
+        init_engines()
+    return SessionLocal()
+
+def new_idempotency_session() -> Session:
+    """
+    Session on the primary from the idempotency store's own pool.
+    """
+    if engine is None:
+        init_engines()
+    return IdempotencySessionLocal()
 
 def get_db():
-    db = SessionLocal()
+    db = new_session()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Session for read-only routes: a replica in round-robin order, or the
+    primary session from get_db when no replica is configured or reachable
+    and when the client reads its own writes.
+    """
+    request.state.read_only = True
+    if replica_router and not reads_from_primary(request):
+        replica_db = replica_router.session()
+        if replica_db is not None:
+            try:
+                yield replica_db
+            finally:
+                replica_db.close()
+            return
+    yield db
+
+async def get_async_db():
+    if engine is None:
+        init_engines()
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,7 +1,44 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.api.v1.router import api_router
+from app.core.admission import AdmissionMiddleware, ClientIdentifier, build_rate_limiter, parse_api_keys
 from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.timing import TimingMiddleware
+from app.db.idempotency import build_idempotency_store
+from app.db.replicas import ReadYourWritesMiddleware
+from app.db.session import admission_gate, dispose_engines, init_engines, new_idempotency_session
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_engines()
+    yield
+    await dispose_engines()
 
-app = FastAPI(title=settings.PROJECT_NAME)
+app = FastAPI(title=settings.PROJECT_NAME, default_response_class=ORJSONResponse, lifespan=lifespan)
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+client_id = ClientIdentifier(parse_api_keys(settings.API_KEYS), settings.TRUST_API_KEY_HEADER)
+idempotency_store = build_idempotency_store(
+    settings.IDEMPOTENCY_BACKEND, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LEASE_SECONDS, new_idempotency_session
+)
+if settings.DATABASE_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=settings.READ_YOUR_WRITES_SECONDS)
+app.add_middleware(
+    AdmissionMiddleware,
+    limiter=build_rate_limiter(settings.RATE_LIMIT_BACKEND, settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST),
+    gate=admission_gate,
+    path_prefixes=[f"{settings.API_V1_STR}/contacts"],
+    client_id=client_id,
+)
+# Outside the admission gate, so retries waiting on a request in flight hold no slot.
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    paths=[f"{settings.API_V1_STR}/contacts/"],
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    client_id=client_id,
+)
+app.add_middleware(TimingMiddleware, slow_request_ms=settings.SLOW_REQUEST_MS)
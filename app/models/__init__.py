@@ -1,7 +1,10 @@
 __all__ = (
     "Base",
     "Contact",
+    "ContactMergeSuggestion",
+    "IdempotencyKey",
 )
 
 from app.db.base import Base
-from app.models.contact import Contact
\ No newline at end of file
+from app.models.contact import Contact, ContactMergeSuggestion
+from app.models.idempotency import IdempotencyKey
\ No newline at end of file
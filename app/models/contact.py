@@ -1,15 +1,85 @@
 import datetime
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint, event, text
+from sqlalchemy.orm import Session, with_loader_criteria
 from app.db.base import Base
 
 
+def utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        # Emails are unique among live contacts; a deleted contact's email can be reused.
+        Index(
+            "ix_contacts_email", "email", unique=True,
+            postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL"),
+        ),
+        # Serves listing and prefix search sorted by name, which page by (name, id).
+        Index("ix_contacts_name_id", "name", "id"),
+        # Serves the change feed, which pages through contacts by (updated_at, id).
+        Index("ix_contacts_updated_at_id", "updated_at", "id"),
+        # Serves the tombstone purge; live contacts, the vast majority, are left out.
+        Index(
+            "ix_contacts_deleted_at", "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"), sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
+
+    # Every index is maintained by every write, so columns only get one when a
+    # query needs it: phone and address are searched through the trigram and
+    # tsvector indexes of the search migration, on Postgres.
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    email = Column(String)
+    phone = Column(String)
+    address = Column(String)
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+    # Incremented by every write; contact ETags are derived from it.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Normalized forms of email, phone and name (see app.core.normalize) that
+    # the deduplication job blocks candidate pairs on. Set by every write, and
+    # backfilled by the job for rows written before they existed.
+    email_normalized = Column(String, index=True)
+    phone_normalized = Column(String, index=True)
+    name_normalized = Column(String, index=True)
+    # Set instead of deleting the row, so the change feed can report the
+    # deletion; tombstones are purged after TOMBSTONE_RETENTION_DAYS.
+    deleted_at = Column(DateTime)
+
+
+class ContactMergeSuggestion(Base):
+    """
+    Pair of contacts the deduplication job scored as probable duplicates,
+    with contact_id < duplicate_id.
+    """
+
+    __tablename__ = "contact_merge_suggestions"
+    __table_args__ = (UniqueConstraint("contact_id", "duplicate_id", name="uq_contact_merge_suggestions_pair"),)
+
+    id = Column(Integer, primary_key=True)
+    contact_id = Column(Integer, ForeignKey("contacts.id", ondelete="CASCADE"), nullable=False, index=True)
+    duplicate_id = Column(Integer, ForeignKey("contacts.id", ondelete="CASCADE"), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    # Comma-separated keys the pair matched on, e.g. "email,name".
+    reasons = Column(String, nullable=False)
+
+
+# Execution option that lets a statement see soft-deleted contacts.
+INCLUDE_DELETED = "include_deleted"
 
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
-    email = Column(String, unique=True, index=True)
-    phone = Column(String, index=True)
-    address = Column(String, index=True)
-    created_at = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc))
-    updated_at = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc))
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_deleted_contacts(execute_state):
+    # Every ORM SELECT, UPDATE and DELETE, sync or async, skips tombstones
+    # unless it opts in with INCLUDE_DELETED.
+    if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+        return
+    if execute_state.is_column_load or execute_state.is_relationship_load:
+        return
+    if execute_state.execution_options.get(INCLUDE_DELETED, False):
+        return
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(Contact, Contact.deleted_at.is_(None), include_aliases=True)
+    )
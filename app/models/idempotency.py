@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, Text
+from app.db.base import Base
+from app.models.contact import utcnow
+
+
+class IdempotencyKey(Base):
+    """
+    Idempotency-Key of a request and the response it was served, replayed to
+    retries of the same request until expires_at (see app.core.idempotency).
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    # Null while the first request with the key is being served.
+    status = Column(Integer)
+    # JSON list of [name, value] header pairs.
+    headers = Column(Text)
+    body = Column(LargeBinary)
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,4 +1,5 @@
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
 class ContactBase(BaseModel):
@@ -9,12 +10,16 @@ class ContactBase(BaseModel):
 
     @field_validator('name')
     def name_must_not_be_empty(cls, v):
+        if v is None:
+            return v
         if not v.strip():
             raise ValueError('Name must not be empty or just whitespace')
         return v.strip()
 
     @field_validator('phone')
     def phone_must_be_valid(cls, v):
+        if v is None:
+            return v
         if not v.startswith('+'):
             if not v.isdigit() or len(v) != 10:
                 raise ValueError('Phone number must be 10 digits if not starting with +')
@@ -32,8 +37,76 @@ class ContactUpdate(ContactBase):
     phone: Optional[str] = Field(None, pattern=r'^\+\d{9,15}$', description="Phone number must be between 9 and 15 digits, and can start with +")
     address: Optional[str] = Field(None, max_length=255, description="Address can be up to 255 characters")
 
+    @field_validator('name', 'email', 'phone')
+    def required_fields_must_not_be_null(cls, v):
+        # Leaving a field out keeps its value; only address can be cleared.
+        if v is None:
+            raise ValueError('Field cannot be null, leave it out to keep its value')
+        return v
+
 class Contact(ContactBase):
     id: int
 
     class ConfigDict:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ContactImportError(BaseModel):
+    line: int
+    error: str
+
+class ContactImportResult(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ContactImportError] = []
+
+# Largest number of contacts accepted by a batch request.
+MAX_BATCH_SIZE = 1000
+
+class ContactBatchGet(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class ContactBatchGetResult(BaseModel):
+    contacts: List[Contact] = []
+    missing: List[int] = []
+
+class ContactBatchUpdateItem(ContactCreate):
+    id: int
+    version: Optional[int] = Field(None, description="Only update the contact if it is still at this version")
+
+class ContactBatchUpdate(BaseModel):
+    items: List[ContactBatchUpdateItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class ContactBatchDeleteItem(BaseModel):
+    id: int
+    version: Optional[int] = Field(None, description="Only delete the contact if it is still at this version")
+
+class ContactBatchDelete(BaseModel):
+    items: List[ContactBatchDeleteItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class ContactBatchItemResult(BaseModel):
+    id: int
+    # HTTP status the single-item route would have answered with.
+    status: int
+    contact: Optional[Contact] = None
+    error: Optional[str] = None
+
+class ContactBatchResult(BaseModel):
+    results: List[ContactBatchItemResult] = []
+
+class ContactMergeSuggestion(BaseModel):
+    id: int
+    score: float
+    # Normalized keys the two contacts share: "email", "phone" and/or "name".
+    reasons: List[str] = []
+    contact: Contact
+    duplicate: Contact
+
+class ContactMerge(BaseModel):
+    contact_id: int = Field(..., description="Contact that is kept")
+    duplicate_ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE, description="Contacts merged into it and deleted")
+
+class ContactChange(Contact):
+    version: int
+    updated_at: datetime
+    deleted: bool = False
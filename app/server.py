@@ -0,0 +1,45 @@
+"""
+Production entry point: several uvicorn worker processes on uvloop and
+httptools, without the file watcher of --reload.
+
+    python -m app.server --workers 4
+
+Each worker imports the app, and with it creates its own engines and pools,
+after it has been started, so no connection is shared between processes. On
+SIGTERM workers stop accepting connections, let in-flight requests finish for
+up to GRACEFUL_SHUTDOWN_SECONDS and then close their pools in the lifespan
+shutdown.
+"""
+import argparse
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def worker_count(configured: int) -> int:
+    return configured if configured > 0 else os.cpu_count() or 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS, help="0 starts one worker per CPU")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=worker_count(args.workers),
+        loop="uvloop",
+        http="httptools",
+        proxy_headers=True,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    main()
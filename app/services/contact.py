@@ -1,47 +1,482 @@
-from pytest import Session
+import csv
+import io
+from typing import Iterator, List, Optional, Set, Tuple, Union
+
+import orjson
+
+from sqlalchemy import Row, Select, func, insert, literal_column, or_, select, text, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCounter, build_cache
+from app.core.config import settings
+from app.core.normalize import normalize_email, normalize_name, normalize_phone
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.contact import Contact, utcnow
+from app.schemas.contact import (
+    Contact as ContactSchema,
+    ContactBatchDeleteItem,
+    ContactBatchItemResult,
+    ContactBatchUpdateItem,
+    ContactCreate,
+    ContactUpdate,
+)
+
+# Public fields of a contact, as exported and cached.
+CONTACT_FIELDS = ("id", "name", "email", "phone", "address")
+
+# Sort orders available for keyset pagination, mapped to the cursor keys.
+CURSOR_SORT_KEYS = {
+    "id": ("id",),
+    "name": ("name", "id"),
+}
+
+# Columns selected by the list endpoints: the public fields plus the version for ETags.
+LIST_COLUMNS = tuple(getattr(Contact, field) for field in CONTACT_FIELDS) + (Contact.version,)
+
+class StaleContactError(Exception):
+    """
+    Raised when a conditional write expected a version of the contact that
+    is no longer current.
+    """
 
-from app.models.contact import Contact
-from app.schemas.contact import ContactCreate
+contact_cache = build_cache(
+    settings.CACHE_BACKEND, settings.CACHE_TTL_SECONDS, settings.CACHE_MAX_ENTRIES, settings.REDIS_URL
+)
 
+# Contact count maintained by the writes of this process, see count_contacts.
+contact_counter = TTLCounter(settings.COUNT_CACHE_TTL_SECONDS)
+
+# Strategies for the total count of the list endpoint, see count_contacts.
+COUNT_STRATEGIES = ("exact", "estimated", "counter")
+
+EXACT_COUNT = select(func.count()).select_from(Contact)
+
+# Planner estimate of the row count, refreshed by VACUUM, ANALYZE and autovacuum.
+# It is -1 on Postgres 14+ for a table that was never analyzed. It counts every
+# row, so it includes tombstones until they are purged after TOMBSTONE_RETENTION_DAYS.
+ESTIMATED_COUNT = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'contacts'::regclass")
+
+def normalized_values(values: dict) -> dict:
+    """
+    Add the normalized columns derived from the email, phone and name present
+    in values, for INSERT and UPDATE statements.
+    """
+    normalized = dict(values)
+    if "email" in values:
+        normalized["email_normalized"] = normalize_email(values["email"])
+    if "phone" in values:
+        normalized["phone_normalized"] = normalize_phone(values["phone"], settings.DEFAULT_PHONE_COUNTRY_CODE)
+    if "name" in values:
+        normalized["name_normalized"] = normalize_name(values["name"])
+    return normalized
+
+def contact_cache_key(contact_id: int) -> str:
+    return f"contact:{contact_id}"
+
+def contact_to_dict(contact: Contact) -> dict:
+    return {**{field: getattr(contact, field) for field in CONTACT_FIELDS}, "version": contact.version}
 
 def get_contact(db: Session, contact_id: int):
     return db.query(Contact).filter(Contact.id == contact_id).first()
 
-def get_contacts(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Contact).offset(skip).limit(limit).all()
+def get_contact_cached(db: Session, contact_id: int) -> Optional[dict]:
+    """
+    Read-through cached version of get_contact returning the contact as a
+    dict. Writes invalidate the entry; the TTL bounds staleness from writes
+    made by other processes when the cache is per process.
+    """
+    key = contact_cache_key(contact_id)
+    cached = contact_cache.get(key)
+    if cached is not None:
+        return cached
+    db_contact = get_contact(db, contact_id)
+    if db_contact is None:
+        return None
+    value = contact_to_dict(db_contact)
+    contact_cache.set(key, value)
+    return value
 
-def create_contact(db: Session, contact: ContactCreate):
-    if contact.email:
-        is_email_exists = db.query(Contact).filter(Contact.email == contact.email).first()
-        if is_email_exists:
-            raise IntegrityError("Email already exists", None, None)
+def get_contacts_by_ids(db: Session, ids: List[int]) -> List[Row]:
+    """
+    Fetch many contacts with one WHERE id IN (...) query, as plain rows of
+    LIST_COLUMNS in the order of ids. Ids that do not exist are left out.
+    """
+    rows = db.execute(select(*LIST_COLUMNS).where(Contact.id.in_(set(ids)))).all()
+    by_id = {row.id: row for row in rows}
+    return [by_id[contact_id] for contact_id in dict.fromkeys(ids) if contact_id in by_id]
+
+def get_contacts(db: Session, skip: int = 0, limit: int = 100, sort: str = "id") -> List[Row]:
+    """
+    Fetch a page of contacts by offset as plain rows of LIST_COLUMNS, which
+    skips ORM hydration; rows still expose the fields as attributes.
+    """
+    columns = [getattr(Contact, key) for key in CURSOR_SORT_KEYS[sort]]
+    return db.execute(select(*LIST_COLUMNS).order_by(*columns).offset(skip).limit(limit)).all()
+
+# Python type of the value each cursor key must hold.
+CURSOR_KEY_TYPES = {
+    "id": int,
+    "name": str,
+}
+
+def _is_cursor_value(key: str, value) -> bool:
+    # bool is an int, but never a valid id.
+    return isinstance(value, CURSOR_KEY_TYPES[key]) and not isinstance(value, bool)
+
+def contacts_page_query(limit: int = 100, cursor: Optional[str] = None, sort: str = "id") -> Select:
+    """
+    Build the keyset pagination query for a page of contacts.
+
+    The cursor holds the sort key of the last row of the previous page, so the
+    query seeks straight to it through the index instead of scanning and
+    discarding OFFSET rows.
+
+    Raises ValueError if the cursor is malformed or was issued for another sort.
+    """
+    keys = CURSOR_SORT_KEYS[sort]
+    columns = [getattr(Contact, key) for key in keys]
+    query = select(*LIST_COLUMNS)
+    if cursor:
+        position = decode_cursor(cursor)
+        if position.get("sort") != sort or any(key not in position for key in keys):
+            raise ValueError("Cursor does not match the requested sort order")
+        if any(not _is_cursor_value(key, position[key]) for key in keys):
+            raise ValueError("Cursor holds an invalid position")
+        values = [position[key] for key in keys]
+        if len(columns) == 1:
+            query = query.where(columns[0] > values[0])
+        else:
+            query = query.where(tuple_(*columns) > tuple_(*values))
+    return query.order_by(*columns).limit(limit)
+
+def get_contacts_page(
+    db: Session, limit: int = 100, cursor: Optional[str] = None, sort: str = "id"
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Fetch a page of contacts using keyset pagination, as plain rows like
+    get_contacts.
+
+    Returns the page and the cursor for the next one, or None when there are
+    no more rows.
+    """
+    contacts = db.execute(contacts_page_query(limit, cursor, sort)).all()
+    return contacts, next_page_cursor(contacts, limit, sort)
+
+def count_contacts(db: Session, strategy: str = "exact") -> int:
+    """
+    Count the contacts with one of COUNT_STRATEGIES:
+
+    - "exact" runs SELECT count(*), which scans the whole table or index.
+    - "estimated" reads the planner statistics from pg_class, in constant time
+      but only as fresh as the last ANALYZE, and including deleted contacts
+      not yet purged (see purge_tombstones); other databases count exactly.
+    - "counter" returns contact_counter, counted exactly at most once per TTL
+      and kept current in between by the creates and deletes of this process.
+    """
+    if strategy == "counter":
+        count = contact_counter.value()
+        if count is None:
+            count = db.scalar(EXACT_COUNT)
+            contact_counter.reset(count)
+        return count
+    if strategy == "estimated" and db.get_bind().dialect.name == "postgresql":
+        estimate = db.scalar(ESTIMATED_COUNT)
+        if estimate >= 0:
+            return estimate
+    return db.scalar(EXACT_COUNT)
+
+def contacts_to_json(rows: List[Row]) -> bytes:
+    """
+    Serialize list rows straight to a JSON array with orjson, without building
+    ORM instances or pydantic models.
+    """
+    return orjson.dumps([dict(zip(CONTACT_FIELDS, row)) for row in rows])
+
+def next_page_cursor(contacts: List[Row], limit: int, sort: str = "id") -> Optional[str]:
+    if not contacts or len(contacts) < limit:
+        return None
+    last = contacts[-1]
+    position = {key: getattr(last, key) for key in CURSOR_SORT_KEYS[sort]}
+    return encode_cursor({"sort": sort, **position})
+
+# Generated tsvector over address, created by the search migration on Postgres.
+ADDRESS_TSV = literal_column("contacts.address_tsv")
+
+def search_contacts(db: Session, q: str, mode: str = "prefix", limit: int = 20) -> List[Contact]:
+    """
+    Search contacts by prefix or fuzzy match on name, email and phone, or by
+    full-text match on address.
 
-    db_contact = Contact(**contact.model_dump())
-    db.add(db_contact)
+    On Postgres these queries are served by the trigram and tsvector GIN
+    indexes; other databases fall back to LIKE scans with the same semantics
+    (fuzzy degrades to substring matching).
+    """
+    term = q.strip().lower()
+    matched = [func.lower(Contact.name), func.lower(Contact.email), Contact.phone]
+    postgres = db.get_bind().dialect.name == "postgresql"
+    query = select(Contact)
+
+    if mode == "prefix":
+        query = query.where(or_(*(column.startswith(term, autoescape=True) for column in matched)))
+        query = query.order_by(Contact.name, Contact.id)
+    elif mode == "fuzzy" and postgres:
+        # "%" is the pg_trgm similarity operator, which can use the trigram indexes.
+        query = query.where(or_(*(column.op("%")(term) for column in matched)))
+        score = func.greatest(*(func.similarity(column, term) for column in matched))
+        query = query.order_by(score.desc(), Contact.id)
+    elif mode == "fuzzy":
+        query = query.where(or_(*(column.contains(term, autoescape=True) for column in matched)))
+        query = query.order_by(Contact.name, Contact.id)
+    elif postgres:
+        tsquery = func.websearch_to_tsquery("simple", q)
+        query = query.where(ADDRESS_TSV.op("@@")(tsquery))
+        query = query.order_by(func.ts_rank(ADDRESS_TSV, tsquery).desc(), Contact.id)
+    else:
+        address = func.lower(Contact.address)
+        query = query.where(*(address.contains(word, autoescape=True) for word in term.split()))
+        query = query.order_by(Contact.id)
+
+    return db.scalars(query.limit(limit)).all()
+
+def insert_ignoring_conflicts(db: Session, rows: List[dict]) -> Set[str]:
+    """
+    Insert contacts with multi-row INSERT ... ON CONFLICT DO NOTHING and a
+    single commit. Rows whose email already exists are skipped by the database.
+
+    Returns the emails of the rows that were actually inserted.
+    """
+    if not rows:
+        return set()
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    statement = (
+        dialect_insert(Contact)
+        .on_conflict_do_nothing(index_elements=[Contact.email], index_where=Contact.deleted_at.is_(None))
+        .returning(Contact.email)
+    )
+    # Executed with a parameter list, SQLAlchemy batches the rows into
+    # multi-row VALUES clauses from one cached compiled statement.
+    inserted = set(db.scalars(statement, [normalized_values(row) for row in rows]).all())
     db.commit()
-    db.refresh(db_contact)
+    contact_counter.adjust(len(inserted))
+    return inserted
+
+def create_contact(db: Session, contact: ContactCreate):
+    """
+    Insert a contact with a single INSERT ... RETURNING statement.
+
+    Duplicate emails are rejected by the unique index on Contact.email rather
+    than a SELECT beforehand, which is both one round trip fewer and safe
+    against concurrent creates. The returned contact is detached, already
+    populated by RETURNING, so the commit does not expire it into a refresh.
+    """
+    statement = insert(Contact).values(**normalized_values(contact.model_dump())).returning(Contact)
+    try:
+        db_contact = db.scalars(statement).one()
+        db.expunge(db_contact)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise IntegrityError("Email already exists", e.params, e.orig)
+    contact_counter.adjust(1)
+    return db_contact
+
+def version_condition(contact_id: int, expected_version: Optional[int]):
+    condition = Contact.id == contact_id
+    if expected_version is not None:
+        condition = condition & (Contact.version == expected_version)
+    return condition
+
+def _check_missing(db: Session, contact_id: int, expected_version: Optional[int]):
+    # A conditional write that matched no row either lost the race against
+    # another write or targeted a contact that does not exist.
+    if expected_version is not None and db.scalar(select(Contact.id).where(Contact.id == contact_id)):
+        raise StaleContactError(f"Contact {contact_id} is no longer at version {expected_version}")
+
+def update_statement(contact_id: int, values: dict, expected_version: Optional[int] = None):
+    return (
+        update(Contact)
+        .where(version_condition(contact_id, expected_version))
+        .values(**normalized_values(values), version=Contact.version + 1)
+        .returning(Contact)
+        .execution_options(populate_existing=True)
+    )
+
+def update_contact(db: Session, contact_id: int, contact: ContactCreate, expected_version: Optional[int] = None):
+    """
+    Replace a contact with a single UPDATE ... RETURNING, bumping its version.
+    With expected_version the write only applies to that version of the row.
+
+    Returns None if the contact does not exist. Raises StaleContactError if it
+    exists at another version.
+    """
+    statement = update_statement(contact_id, contact.model_dump(), expected_version)
+    try:
+        db_contact = db.scalars(statement).one_or_none()
+        if db_contact is not None:
+            db.expunge(db_contact)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise IntegrityError("Email already exists", e.params, e.orig)
+    if db_contact is None:
+        _check_missing(db, contact_id, expected_version)
+    contact_cache.delete(contact_cache_key(contact_id))
     return db_contact
 
-def update_contact(db: Session, contact_id: int, contact: ContactCreate):
-    if contact.email:
-        is_email_exists = db.query(Contact).filter(Contact.email == contact.email, Contact.id != contact_id).first()
-        if is_email_exists:
-            raise IntegrityError("Email already exists", None, None)
-    
-    db_contact = db.query(Contact).filter(Contact.id == contact_id).first()
-    if db_contact:
-        for key, value in contact.model_dump().items():
-            setattr(db_contact, key, value)
+def patch_statement(contact_id: int, values: dict, expected_version: Optional[int] = None):
+    # Only matches when a value actually changes, so a no-op PATCH writes
+    # nothing and keeps version and updated_at.
+    changed = or_(*(getattr(Contact, field).is_distinct_from(value) for field, value in values.items()))
+    return update_statement(contact_id, values, expected_version).where(changed)
+
+def patch_contact(db: Session, contact_id: int, contact: ContactUpdate, expected_version: Optional[int] = None):
+    """
+    Apply a partial update with a single UPDATE ... SET <changed columns>
+    RETURNING, without loading the row first. Columns left out of the request
+    are not written, and updated_at (through the column's onupdate) and the
+    version are only bumped when a value actually changes.
+
+    Same return and errors as update_contact.
+    """
+    values = contact.model_dump(exclude_unset=True)
+    if values:
+        try:
+            db_contact = db.scalars(patch_statement(contact_id, values, expected_version)).one_or_none()
+            if db_contact is not None:
+                db.expunge(db_contact)
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise IntegrityError("Email already exists", e.params, e.orig)
+        if db_contact is not None:
+            contact_cache.delete(contact_cache_key(contact_id))
+            return db_contact
+    # Nothing was written: the contact is missing, at another version, or
+    # already holds these values.
+    db_contact = get_contact(db, contact_id)
+    if db_contact is not None and expected_version is not None and db_contact.version != expected_version:
+        raise StaleContactError(f"Contact {contact_id} is no longer at version {expected_version}")
+    return db_contact
 
+def soft_delete_statement(condition):
+    """
+    UPDATE ... RETURNING that turns the matching contacts into tombstones:
+    deleted_at is set and the version bumped, and the row stays for the
+    change feed until purge_tombstones removes it.
+    """
+    return (
+        update(Contact)
+        .where(condition)
+        .values(deleted_at=utcnow(), version=Contact.version + 1)
+        .returning(Contact)
+        .execution_options(populate_existing=True)
+    )
+
+def delete_contact(db: Session, contact_id: int, expected_version: Optional[int] = None):
+    """
+    Soft-delete a contact with a single UPDATE ... RETURNING, optionally only
+    if it is still at expected_version. Same return and errors as update_contact.
+    """
+    statement = soft_delete_statement(version_condition(contact_id, expected_version))
+    db_contact = db.scalars(statement).one_or_none()
+    if db_contact is not None:
+        db.expunge(db_contact)
     db.commit()
-    db.refresh(db_contact)
+    if db_contact is None:
+        _check_missing(db, contact_id, expected_version)
+    else:
+        contact_counter.adjust(-1)
+    contact_cache.delete(contact_cache_key(contact_id))
     return db_contact
 
-def delete_contact(db: Session, contact_id: int):
-    db_contact = db.query(Contact).filter(Contact.id == contact_id).first()
-    if db_contact:
-        db.delete(db_contact)
-        db.commit()
-        return db_contact
-    return None
+def _batch_result(contact_id: int, status: int, db_contact: Optional[Contact] = None, error: Optional[str] = None):
+    contact = ContactSchema(**contact_to_dict(db_contact)) if db_contact is not None else None
+    return ContactBatchItemResult(id=contact_id, status=status, contact=contact, error=error)
+
+def update_contacts(db: Session, items: List[ContactBatchUpdateItem]) -> List[ContactBatchItemResult]:
+    """
+    Apply many updates in one transaction with a single commit, returning a
+    result per item with the status the single-item route would give.
+
+    Each item runs in its own savepoint, so a duplicate email only rolls back
+    that item; missing contacts are 404 and version mismatches 412.
+    """
+    results, updated = [], []
+    for item in items:
+        values = item.model_dump(exclude={"id", "version"})
+        try:
+            with db.begin_nested():
+                db_contact = db.scalars(update_statement(item.id, values, item.version)).one_or_none()
+        except IntegrityError:
+            results.append(_batch_result(item.id, 400, error="Email already exists"))
+            continue
+        if db_contact is not None:
+            db.expunge(db_contact)
+            updated.append(item.id)
+            results.append(_batch_result(item.id, 200, db_contact))
+        elif item.version is not None and db.scalar(select(Contact.id).where(Contact.id == item.id)):
+            results.append(_batch_result(item.id, 412, error="Contact was modified"))
+        else:
+            results.append(_batch_result(item.id, 404, error="Contact not found"))
+    db.commit()
+    for contact_id in updated:
+        contact_cache.delete(contact_cache_key(contact_id))
+    return results
+
+def delete_contacts(db: Session, items: List[ContactBatchDeleteItem]) -> List[ContactBatchItemResult]:
+    """
+    Soft-delete many contacts with a single UPDATE ... RETURNING and one commit,
+    honouring each item's expected version. Items that matched no row cost one
+    more SELECT in total to tell missing (404) from modified (412) contacts.
+    """
+    condition = or_(*(version_condition(item.id, item.version) for item in items))
+    deleted = {contact.id: contact for contact in db.scalars(soft_delete_statement(condition))}
+    for db_contact in deleted.values():
+        db.expunge(db_contact)
+    unmatched = {item.id for item in items if item.id not in deleted}
+    existing = set(db.scalars(select(Contact.id).where(Contact.id.in_(unmatched)))) if unmatched else set()
+    db.commit()
+    contact_counter.adjust(-len(deleted))
+
+    results = []
+    for item in items:
+        if item.id in deleted:
+            contact_cache.delete(contact_cache_key(item.id))
+            results.append(_batch_result(item.id, 200, deleted[item.id]))
+        elif item.id in existing:
+            results.append(_batch_result(item.id, 412, error="Contact was modified"))
+        else:
+            results.append(_batch_result(item.id, 404, error="Contact not found"))
+    return results
+
+def export_contacts(db: Session, fmt: str = "ndjson", chunk_size: int = 1000) -> Iterator[Union[bytes, str]]:
+    """
+    Stream every contact as NDJSON bytes or CSV text, one chunk per batch of rows.
+
+    Rows come from a server-side cursor (yield_per) as plain tuples, so memory
+    stays flat regardless of the table size. The generator owns the session
+    from here on and closes it when exhausted or abandoned.
+    """
+    statement = (
+        select(*(getattr(Contact, column) for column in CONTACT_FIELDS))
+        .order_by(Contact.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    try:
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(CONTACT_FIELDS)
+            yield buffer.getvalue()
+        for rows in db.execute(statement).partitions():
+            if fmt == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(rows)
+                yield buffer.getvalue()
+            else:
+                yield b"".join(orjson.dumps(dict(zip(CONTACT_FIELDS, row))) + b"\n" for row in rows)
+    finally:
+        db.close()
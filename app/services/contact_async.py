@@ -0,0 +1,134 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Row, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.contact import Contact
+from app.schemas.contact import ContactCreate, ContactUpdate
+from app.services.contact import (
+    CURSOR_SORT_KEYS,
+    ESTIMATED_COUNT,
+    EXACT_COUNT,
+    LIST_COLUMNS,
+    StaleContactError,
+    contact_cache,
+    contact_cache_key,
+    contact_counter,
+    contact_to_dict,
+    contacts_page_query,
+    next_page_cursor,
+    normalized_values,
+    patch_statement,
+    soft_delete_statement,
+    update_statement,
+    version_condition,
+)
+
+
+async def get_contact(db: AsyncSession, contact_id: int):
+    return await db.get(Contact, contact_id)
+
+async def get_contact_cached(db: AsyncSession, contact_id: int) -> Optional[dict]:
+    key = contact_cache_key(contact_id)
+    cached = contact_cache.get(key)
+    if cached is not None:
+        return cached
+    db_contact = await get_contact(db, contact_id)
+    if db_contact is None:
+        return None
+    value = contact_to_dict(db_contact)
+    contact_cache.set(key, value)
+    return value
+
+async def get_contacts(db: AsyncSession, skip: int = 0, limit: int = 100, sort: str = "id") -> List[Row]:
+    columns = [getattr(Contact, key) for key in CURSOR_SORT_KEYS[sort]]
+    result = await db.execute(select(*LIST_COLUMNS).order_by(*columns).offset(skip).limit(limit))
+    return result.all()
+
+async def get_contacts_page(
+    db: AsyncSession, limit: int = 100, cursor: Optional[str] = None, sort: str = "id"
+) -> Tuple[List[Row], Optional[str]]:
+    result = await db.execute(contacts_page_query(limit, cursor, sort))
+    contacts = result.all()
+    return contacts, next_page_cursor(contacts, limit, sort)
+
+async def count_contacts(db: AsyncSession, strategy: str = "exact") -> int:
+    if strategy == "counter":
+        count = contact_counter.value()
+        if count is None:
+            count = await db.scalar(EXACT_COUNT)
+            contact_counter.reset(count)
+        return count
+    if strategy == "estimated" and db.get_bind().dialect.name == "postgresql":
+        estimate = await db.scalar(ESTIMATED_COUNT)
+        if estimate >= 0:
+            return estimate
+    return await db.scalar(EXACT_COUNT)
+
+async def create_contact(db: AsyncSession, contact: ContactCreate):
+    statement = insert(Contact).values(**normalized_values(contact.model_dump())).returning(Contact)
+    try:
+        db_contact = (await db.scalars(statement)).one()
+        db.expunge(db_contact)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise IntegrityError("Email already exists", e.params, e.orig)
+    contact_counter.adjust(1)
+    return db_contact
+
+async def _check_missing(db: AsyncSession, contact_id: int, expected_version: Optional[int]):
+    if expected_version is not None and await db.scalar(select(Contact.id).where(Contact.id == contact_id)):
+        raise StaleContactError(f"Contact {contact_id} is no longer at version {expected_version}")
+
+async def update_contact(
+    db: AsyncSession, contact_id: int, contact: ContactCreate, expected_version: Optional[int] = None
+):
+    statement = update_statement(contact_id, contact.model_dump(), expected_version)
+    try:
+        db_contact = (await db.scalars(statement)).one_or_none()
+        if db_contact is not None:
+            db.expunge(db_contact)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise IntegrityError("Email already exists", e.params, e.orig)
+    if db_contact is None:
+        await _check_missing(db, contact_id, expected_version)
+    contact_cache.delete(contact_cache_key(contact_id))
+    return db_contact
+
+async def patch_contact(
+    db: AsyncSession, contact_id: int, contact: ContactUpdate, expected_version: Optional[int] = None
+):
+    values = contact.model_dump(exclude_unset=True)
+    if values:
+        try:
+            db_contact = (await db.scalars(patch_statement(contact_id, values, expected_version))).one_or_none()
+            if db_contact is not None:
+                db.expunge(db_contact)
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            raise IntegrityError("Email already exists", e.params, e.orig)
+        if db_contact is not None:
+            contact_cache.delete(contact_cache_key(contact_id))
+            return db_contact
+    db_contact = await get_contact(db, contact_id)
+    if db_contact is not None and expected_version is not None and db_contact.version != expected_version:
+        raise StaleContactError(f"Contact {contact_id} is no longer at version {expected_version}")
+    return db_contact
+
+async def delete_contact(db: AsyncSession, contact_id: int, expected_version: Optional[int] = None):
+    statement = soft_delete_statement(version_condition(contact_id, expected_version))
+    db_contact = (await db.scalars(statement)).one_or_none()
+    if db_contact is not None:
+        db.expunge(db_contact)
+    await db.commit()
+    if db_contact is None:
+        await _check_missing(db, contact_id, expected_version)
+    else:
+        contact_counter.adjust(-1)
+    contact_cache.delete(contact_cache_key(contact_id))
+    return db_contact
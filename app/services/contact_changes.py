@@ -0,0 +1,94 @@
+import datetime
+from typing import List, Optional, Tuple
+
+import orjson
+from sqlalchemy import Row, delete, or_, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.contact import INCLUDE_DELETED, Contact, ContactMergeSuggestion, utcnow
+from app.services.contact import CONTACT_FIELDS, LIST_COLUMNS
+
+# Columns of a change: the contact as listed, plus its position in the feed
+# and whether it was deleted.
+CHANGE_COLUMNS = LIST_COLUMNS + (Contact.updated_at, Contact.deleted_at)
+
+class CursorExpiredError(Exception):
+    """
+    Raised when a change feed cursor is older than the tombstone retention,
+    so deletions since then may already have been purged.
+    """
+
+def _naive_utc(value: datetime.datetime) -> datetime.datetime:
+    # Timestamps are stored without a time zone, in UTC.
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+def get_changes(db: Session, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Row], Optional[str]]:
+    """
+    Page through the contacts created, updated or deleted after the cursor,
+    in (updated_at, id) order along the index on those columns, tombstones
+    included.
+
+    Changes from the last CHANGE_FEED_LAG_SECONDS are held back: a slower
+    transaction may still commit a change stamped before them, which a
+    client that had already moved past would miss.
+
+    Returns the page and the cursor to continue from, which is the given
+    cursor when there is nothing new. Raises ValueError if the cursor is
+    malformed and CursorExpiredError if it is too old.
+    """
+    query = select(*CHANGE_COLUMNS).execution_options(**{INCLUDE_DELETED: True})
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            since = datetime.datetime.fromisoformat(position["updated_at"])
+            last_id = int(position["id"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError("Cursor is not a change feed cursor") from e
+        retention = datetime.timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+        if _naive_utc(since) < _naive_utc(utcnow() - retention):
+            raise CursorExpiredError("Cursor is older than the tombstone retention")
+        query = query.where(tuple_(Contact.updated_at, Contact.id) > tuple_(since, last_id))
+    settled = utcnow() - datetime.timedelta(seconds=settings.CHANGE_FEED_LAG_SECONDS)
+    query = query.where(Contact.updated_at <= settled).order_by(Contact.updated_at, Contact.id).limit(limit)
+    changes = db.execute(query).all()
+    if not changes:
+        return changes, cursor
+    last = changes[-1]
+    return changes, encode_cursor({"updated_at": last.updated_at.isoformat(), "id": last.id})
+
+def changes_to_json(rows: List[Row]) -> bytes:
+    return orjson.dumps([
+        {
+            **dict(zip(CONTACT_FIELDS, row)),
+            "version": row.version,
+            "updated_at": row.updated_at,
+            "deleted": row.deleted_at is not None,
+        }
+        for row in rows
+    ])
+
+def purge_tombstones(db: Session, retention_days: Optional[float] = None, batch_size: int = 1000) -> int:
+    """
+    Permanently delete contacts soft-deleted more than retention_days ago,
+    batch by batch with a commit each, so the purge does not hold long locks.
+
+    Returns the number of contacts purged.
+    """
+    if retention_days is None:
+        retention_days = settings.TOMBSTONE_RETENTION_DAYS
+    cutoff = utcnow() - datetime.timedelta(days=retention_days)
+    purged = 0
+    while True:
+        ids = db.scalars(
+            select(Contact.id).where(Contact.deleted_at < cutoff).limit(batch_size)
+            .execution_options(**{INCLUDE_DELETED: True})
+        ).all()
+        if not ids:
+            return purged
+        involved = or_(ContactMergeSuggestion.contact_id.in_(ids), ContactMergeSuggestion.duplicate_id.in_(ids))
+        db.execute(delete(ContactMergeSuggestion).where(involved))
+        db.execute(delete(Contact).where(Contact.id.in_(ids)).execution_options(**{INCLUDE_DELETED: True}))
+        db.commit()
+        purged += len(ids)
@@ -0,0 +1,262 @@
+import difflib
+import itertools
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Row, bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.core.normalize import normalize_email, normalize_name, normalize_phone
+from app.models.contact import Contact, ContactMergeSuggestion
+from app.services import contact as contact_service
+
+# Normalized columns candidate pairs are blocked on, keyed by the reason
+# reported for a match, with the weight a match adds to the pair score.
+BLOCKING_KEYS = {
+    "email": Contact.email_normalized,
+    "phone": Contact.phone_normalized,
+    "name": Contact.name_normalized,
+}
+MATCH_WEIGHTS = {"email": 0.5, "phone": 0.3}
+# Weight of the name similarity, which is fuzzy rather than exact.
+NAME_WEIGHT = 0.2
+
+# Columns read for scoring, in the order of the rows handled below.
+DEDUP_COLUMNS = (Contact.id, Contact.email_normalized, Contact.phone_normalized, Contact.name_normalized)
+
+contacts_table = Contact.__table__
+
+# Executemany UPDATE of the normalized columns by id. updated_at is set to
+# itself so that the backfill does not look like a change of the contact.
+BACKFILL_STATEMENT = (
+    update(contacts_table)
+    .where(contacts_table.c.id == bindparam("row_id"))
+    .values(
+        email_normalized=bindparam("email_value"),
+        phone_normalized=bindparam("phone_value"),
+        name_normalized=bindparam("name_value"),
+        updated_at=contacts_table.c.updated_at,
+    )
+)
+
+
+@dataclass
+class DedupReport:
+    normalized: int = 0
+    candidate_pairs: int = 0
+    suggestions: int = 0
+    # Groups sharing a key that were larger than max_block_size and skipped.
+    skipped_blocks: int = 0
+
+
+def normalize_rows(rows: List[Tuple], country_code: str) -> List[dict]:
+    """
+    Backfill parameters for (id, name, email, phone) rows. A module-level
+    function so it can run in a process pool.
+    """
+    return [
+        {
+            "row_id": row_id,
+            "email_value": normalize_email(email),
+            "phone_value": normalize_phone(phone, country_code),
+            "name_value": normalize_name(name),
+        }
+        for row_id, name, email, phone in rows
+    ]
+
+
+def backfill_normalized(db: Session, batch_size: int, executor: Optional[Executor] = None, workers: int = 1) -> int:
+    """
+    Fill the normalized columns of contacts that lack them, batch by batch in
+    id order, with one executemany UPDATE and commit per batch. With an
+    executor, each batch is normalized in `workers` chunks in parallel.
+
+    Returns the number of contacts normalized.
+    """
+    missing = or_(*(column.is_(None) for column in BLOCKING_KEYS.values()))
+    total, last_id = 0, 0
+    while True:
+        rows = db.execute(
+            select(Contact.id, Contact.name, Contact.email, Contact.phone)
+            .where(missing, Contact.id > last_id)
+            .order_by(Contact.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return total
+        rows = [tuple(row) for row in rows]
+        if executor is None:
+            params = normalize_rows(rows, settings.DEFAULT_PHONE_COUNTRY_CODE)
+        else:
+            size = -(-len(rows) // workers)
+            chunks = [rows[start:start + size] for start in range(0, len(rows), size)]
+            results = executor.map(normalize_rows, chunks, itertools.repeat(settings.DEFAULT_PHONE_COUNTRY_CODE))
+            params = list(itertools.chain.from_iterable(results))
+        db.execute(BACKFILL_STATEMENT, params)
+        db.commit()
+        total += len(rows)
+        last_id = rows[-1][0]
+
+
+def candidate_blocks(db: Session, reason: str, batch_size: int) -> Iterator[List[Row]]:
+    """
+    Yield the groups of contacts that share the normalized value of one key,
+    found with GROUP BY on its index instead of comparing every pair.
+    """
+    column = BLOCKING_KEYS[reason]
+    shared = select(column).where(column.is_not(None)).group_by(column).having(func.count() > 1)
+    rows = db.execute(
+        select(*DEDUP_COLUMNS, column.label("block_key"))
+        .where(column.in_(shared))
+        .order_by(column, Contact.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for _, block in itertools.groupby(rows, key=lambda row: row.block_key):
+        yield list(block)
+
+
+def score_pair(first: Row, second: Row) -> Tuple[float, List[str]]:
+    """
+    Score a candidate pair between 0 and 1: exact matches of the normalized
+    email and phone plus the similarity of the normalized names.
+    """
+    reasons = [
+        reason for reason, column in (("email", "email_normalized"), ("phone", "phone_normalized"))
+        if getattr(first, column) is not None and getattr(first, column) == getattr(second, column)
+    ]
+    score = sum(MATCH_WEIGHTS[reason] for reason in reasons)
+    if first.name_normalized and second.name_normalized:
+        similarity = difflib.SequenceMatcher(None, first.name_normalized, second.name_normalized).ratio()
+        score += NAME_WEIGHT * similarity
+        if similarity == 1:
+            reasons.append("name")
+    return round(score, 4), reasons
+
+
+def find_duplicates(
+    db: Session,
+    batch_size: Optional[int] = None,
+    min_score: Optional[float] = None,
+    max_block_size: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    workers: int = 1,
+) -> DedupReport:
+    """
+    Run the deduplication job: backfill the normalized columns, collect the
+    candidate pairs that share a normalized email, phone or name, score them
+    and replace the stored merge suggestions with the pairs scoring at least
+    min_score. Blocks larger than max_block_size, such as a very common name,
+    carry little signal and are skipped to keep the work near linear.
+
+    A pair that only shares its name scores at most NAME_WEIGHT, so names are
+    only blocked on when min_score is that low.
+    """
+    batch_size = batch_size or settings.DEDUP_BATCH_SIZE
+    min_score = settings.DEDUP_MIN_SCORE if min_score is None else min_score
+    max_block_size = max_block_size or settings.DEDUP_MAX_BLOCK_SIZE
+    report = DedupReport(normalized=backfill_normalized(db, batch_size, executor, workers))
+
+    pairs: Dict[Tuple[int, int], Tuple[Row, Row]] = {}
+    for reason in BLOCKING_KEYS:
+        if reason == "name" and NAME_WEIGHT < min_score:
+            continue
+        for block in candidate_blocks(db, reason, batch_size):
+            if len(block) > max_block_size:
+                report.skipped_blocks += 1
+                continue
+            for first, second in itertools.combinations(block, 2):
+                pairs.setdefault((first.id, second.id), (first, second))
+    report.candidate_pairs = len(pairs)
+
+    suggestions = []
+    for (contact_id, duplicate_id), (first, second) in pairs.items():
+        score, reasons = score_pair(first, second)
+        if score >= min_score:
+            suggestions.append(
+                {"contact_id": contact_id, "duplicate_id": duplicate_id, "score": score, "reasons": ",".join(reasons)}
+            )
+    db.execute(delete(ContactMergeSuggestion))
+    for start in range(0, len(suggestions), batch_size):
+        db.execute(insert(ContactMergeSuggestion), suggestions[start:start + batch_size])
+    db.commit()
+    report.suggestions = len(suggestions)
+    return report
+
+
+def get_merge_suggestions(db: Session, limit: int = 100, after_id: int = 0) -> List[dict]:
+    """
+    Page through the merge suggestions by descending score, each with both
+    contacts as dicts. after_id continues from the last suggestion id of the
+    previous page, which is ordered by (score, id).
+    """
+    duplicate = aliased(Contact)
+    query = (
+        select(ContactMergeSuggestion, Contact, duplicate)
+        .join(Contact, Contact.id == ContactMergeSuggestion.contact_id)
+        .join(duplicate, duplicate.id == ContactMergeSuggestion.duplicate_id)
+        .order_by(ContactMergeSuggestion.score.desc(), ContactMergeSuggestion.id)
+        .limit(limit)
+    )
+    if after_id:
+        last = db.get(ContactMergeSuggestion, after_id)
+        if last is not None:
+            query = query.where(
+                or_(
+                    ContactMergeSuggestion.score < last.score,
+                    (ContactMergeSuggestion.score == last.score) & (ContactMergeSuggestion.id > last.id),
+                )
+            )
+    return [
+        {
+            "id": suggestion.id,
+            "score": suggestion.score,
+            "reasons": suggestion.reasons.split(",") if suggestion.reasons else [],
+            "contact": contact_service.contact_to_dict(contact),
+            "duplicate": contact_service.contact_to_dict(other),
+        }
+        for suggestion, contact, other in db.execute(query)
+    ]
+
+
+def merge_contacts(db: Session, contact_id: int, duplicate_ids: List[int]) -> Optional[Contact]:
+    """
+    Merge duplicates into the contact in one transaction: fields the contact
+    lacks are filled from the duplicates, the duplicates are soft-deleted and
+    every suggestion involving them is dropped, and the contact's version is
+    bumped.
+
+    Returns None if any of the contacts does not exist. Raises ValueError if
+    the contact is listed among its own duplicates.
+    """
+    duplicate_ids = list(dict.fromkeys(duplicate_ids))
+    if contact_id in duplicate_ids:
+        raise ValueError("A contact cannot be merged into itself")
+    ids = [contact_id, *duplicate_ids]
+    contacts = {
+        contact.id: contact
+        for contact in db.scalars(select(Contact).where(Contact.id.in_(ids)).with_for_update())
+    }
+    if len(contacts) != len(ids):
+        db.rollback()
+        return None
+
+    values = {}
+    if contacts[contact_id].address is None:
+        values["address"] = next(
+            (contacts[duplicate_id].address for duplicate_id in duplicate_ids if contacts[duplicate_id].address), None
+        )
+    involved = or_(
+        ContactMergeSuggestion.contact_id.in_(duplicate_ids), ContactMergeSuggestion.duplicate_id.in_(duplicate_ids)
+    )
+    db.execute(delete(ContactMergeSuggestion).where(involved))
+    db.execute(contact_service.soft_delete_statement(Contact.id.in_(duplicate_ids)))
+    db_contact = db.scalars(contact_service.update_statement(contact_id, values)).one()
+    db.expunge_all()
+    db.commit()
+
+    contact_service.contact_counter.adjust(-len(duplicate_ids))
+    for merged_id in ids:
+        contact_service.contact_cache.delete(contact_service.contact_cache_key(merged_id))
+    return db_contact
@@ -0,0 +1,147 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.schemas.contact import ContactCreate, ContactImportError, ContactImportResult
+from app.services import contact as contact_service
+
+# Request content types accepted by the import endpoint, mapped to the record format.
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+# Per-row errors returned in the response; later ones are only counted.
+MAX_REPORTED_ERRORS = 1000
+
+
+async def aiter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a streamed UTF-8 body into lines without buffering it whole.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def record_parser(fmt: str) -> Callable[[str], Optional[dict]]:
+    """
+    Return a function turning one line into a record dict. For CSV the first
+    line is the header and yields None; records must not span lines.
+
+    The returned function raises ValueError for lines that cannot be parsed.
+    """
+    if fmt == "ndjson":
+        def parse_ndjson(line: str) -> Optional[dict]:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Each line must be a JSON object")
+            return record
+        return parse_ndjson
+
+    header: List[str] = []
+
+    def parse_csv(line: str) -> Optional[dict]:
+        try:
+            values = next(csv.reader([line]))
+        except csv.Error as e:
+            raise ValueError(str(e)) from e
+        if not header:
+            header.extend(value.strip() for value in values)
+            return None
+        if len(values) != len(header):
+            raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+        return {key: value or None for key, value in zip(header, values)}
+    return parse_csv
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()
+    )
+
+
+def import_batch(db: Session, records: List[Tuple[int, dict]]) -> Tuple[int, List[ContactImportError]]:
+    """
+    Validate a batch of records with ContactCreate and insert the valid ones
+    in one statement and one commit.
+
+    Returns the number of inserted rows and the errors of the rejected ones.
+    """
+    errors: List[ContactImportError] = []
+    rows: Dict[str, Tuple[int, dict]] = {}
+    for line, record in records:
+        try:
+            contact = ContactCreate.model_validate(record)
+        except ValidationError as e:
+            errors.append(ContactImportError(line=line, error=format_validation_error(e)))
+            continue
+        if contact.email in rows:
+            errors.append(ContactImportError(line=line, error="Email already exists"))
+            continue
+        rows[contact.email] = (line, contact.model_dump())
+
+    inserted = contact_service.insert_ignoring_conflicts(db, [row for _, row in rows.values()])
+    for email, (line, _) in rows.items():
+        if email not in inserted:
+            errors.append(ContactImportError(line=line, error="Email already exists"))
+    return len(inserted), errors
+
+
+async def import_stream(
+    db: Session, lines: AsyncIterator[str], fmt: str, batch_size: int
+) -> ContactImportResult:
+    """
+    Import contacts from a stream of lines, flushing one batch at a time so
+    memory stays bounded by the batch size. Database work runs on the
+    threadpool to keep the event loop free while the body is still arriving.
+    """
+    parse = record_parser(fmt)
+    result = ContactImportResult()
+    batch: List[Tuple[int, dict]] = []
+
+    def add_errors(errors: List[ContactImportError]):
+        result.failed += len(errors)
+        room = MAX_REPORTED_ERRORS - len(result.errors)
+        result.errors.extend(errors[:max(room, 0)])
+
+    async def flush():
+        inserted, errors = await run_in_threadpool(import_batch, db, batch)
+        result.inserted += inserted
+        add_errors(errors)
+        batch.clear()
+
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = parse(line)
+        except ValueError as e:
+            result.received += 1
+            add_errors([ContactImportError(line=line_number, error=str(e))])
+            continue
+        if record is None:
+            continue
+        result.received += 1
+        batch.append((line_number, record))
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    result.errors.sort(key=lambda error: error.line)
+    return result
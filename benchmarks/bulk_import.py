@@ -0,0 +1,50 @@
+"""
+Measure bulk import throughput in rows per second.
+
+    python -m benchmarks.bulk_import --rows 200000 --format csv
+"""
+import asyncio
+import json
+import time
+
+from sqlalchemy import delete
+
+from app.models.contact import Contact
+from app.services.contact_import import import_stream
+from benchmarks.common import base_parser, make_session, synthetic_contact
+
+
+async def generate_lines(rows: int, fmt: str):
+    if fmt == "csv":
+        yield "name,email,phone,address"
+        for i in range(rows):
+            contact = synthetic_contact(i)
+            yield f"{contact['name']},{contact['email']},{contact['phone']},{contact['address']}"
+    else:
+        for i in range(rows):
+            yield json.dumps(synthetic_contact(i))
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_session(args.database_url)
+    db = SessionLocal()
+    try:
+        db.execute(delete(Contact))
+        db.commit()
+        start = time.perf_counter()
+        result = asyncio.run(import_stream(db, generate_lines(args.rows, args.format), args.format, args.batch_size))
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"inserted {result.inserted} of {result.received} rows in {elapsed:.2f}s "
+          f"({result.inserted / elapsed:,.0f} rows/s, batch size {args.batch_size})")
+
+
+if __name__ == "__main__":
+    main()
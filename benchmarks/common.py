@@ -0,0 +1,85 @@
+import argparse
+import statistics
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.contact import Contact
+
+DEFAULT_DATABASE_URL = "sqlite:///./bench.db"
+SEED_CHUNK_SIZE = 10_000
+
+
+def base_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL, help="Database to benchmark against")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement")
+    return parser
+
+
+def make_session(database_url: str):
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def synthetic_contact(i: int) -> dict:
+    return {
+        "name": f"Contact {i:08d}",
+        "email": f"contact{i}@example.com",
+        "phone": f"+1{i:010d}",
+        "address": f"{i} Benchmark Street",
+    }
+
+
+def seed_contacts(engine, rows: int) -> int:
+    """
+    Top the contacts table up to `rows` synthetic contacts and return the row count.
+    """
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(Contact)).scalar_one()
+        for start in range(existing, rows, SEED_CHUNK_SIZE):
+            stop = min(start + SEED_CHUNK_SIZE, rows)
+            conn.execute(insert(Contact), [synthetic_contact(i) for i in range(start, stop)])
+    return max(existing, rows)
+
+
+@contextmanager
+def stopwatch(samples: list):
+    start = time.perf_counter()
+    yield
+    samples.append((time.perf_counter() - start) * 1000)
+
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "median_ms": round(statistics.median(ordered), 3),
+        "min_ms": round(ordered[0], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def latency_summary(samples: list, elapsed: float) -> dict:
+    ordered = sorted(samples)
+    return {
+        "requests": len(ordered),
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
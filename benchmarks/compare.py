@@ -0,0 +1,39 @@
+"""
+Compare two result files written by benchmarks.load, route by route.
+
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+import argparse
+import json
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"{baseline['label']} -> {candidate['label']}")
+    for route, after in candidate["results"].items():
+        before = baseline["results"].get(route)
+        if not before or not before.get("requests") or not after.get("requests"):
+            continue
+        cells = [f"{metric} {before[metric]} -> {after[metric]} ({change(before[metric], after[metric])})" for metric in METRICS]
+        print(f"{route:>16}: " + ", ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
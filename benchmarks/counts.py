@@ -0,0 +1,49 @@
+"""
+Compare the cost of the total count strategies of GET /contacts/?count=...
+
+    python -m benchmarks.counts --rows 1000000 --database-url postgresql://...
+
+"counter" is timed both when it has to recount (right after its TTL ran out)
+and when it is served from memory, the common case.
+"""
+from sqlalchemy import text
+
+from app.services import contact as contact_service
+from benchmarks.common import base_parser, make_session, seed_contacts, stopwatch, summarize
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_session(args.database_url)
+    total = seed_contacts(engine, args.rows)
+    if engine.dialect.name == "postgresql":
+        # The estimate is only as fresh as the table statistics.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE contacts"))
+    print(f"{total} contacts in {args.database_url}")
+
+    db = SessionLocal()
+    try:
+        for strategy in contact_service.COUNT_STRATEGIES:
+            samples, count = [], None
+            for _ in range(args.repeat):
+                if strategy == "counter":
+                    contact_service.contact_counter.clear()
+                with stopwatch(samples):
+                    count = contact_service.count_contacts(db, strategy)
+            print(f"{strategy:>14}: count {count}, {summarize(samples)}")
+
+        samples = []
+        for _ in range(args.repeat):
+            with stopwatch(samples):
+                count = contact_service.count_contacts(db, "counter")
+        print(f"{'counter (warm)':>14}: count {count}, {summarize(samples)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Time the deduplication job on a table where a share of the contacts have a
+near-duplicate (other email casing, formatted phone, extra whitespace).
+
+    python -m benchmarks.dedup --rows 1000000 --workers 4 --database-url postgresql://...
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import func, insert, select, update
+
+from app.models.contact import Contact
+from app.services.contact_dedup import find_duplicates
+from benchmarks.common import SEED_CHUNK_SIZE, base_parser, make_session, seed_contacts, synthetic_contact
+
+
+def near_duplicate(i: int) -> dict:
+    contact = synthetic_contact(i)
+    digits = contact["phone"][2:]
+    return {
+        "name": f"  {contact['name'].upper()} ",
+        "email": contact["email"].upper(),
+        "phone": f"({digits[:3]}) {digits[3:6]}-{digits[6:]}",
+        "address": contact["address"],
+    }
+
+
+def seed_duplicates(engine, rows: int, every: int) -> int:
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(Contact).where(Contact.name.startswith("  "))).scalar_one()
+        if existing:
+            return existing
+        ids = range(0, rows, every)
+        for start in range(0, len(ids), SEED_CHUNK_SIZE):
+            conn.execute(insert(Contact), [near_duplicate(i) for i in ids[start:start + SEED_CHUNK_SIZE]])
+        return len(ids)
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--duplicate-every", type=int, default=20, help="Add a near-duplicate of every n-th contact")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_session(args.database_url)
+    total = seed_contacts(engine, args.rows)
+    duplicates = seed_duplicates(engine, total, args.duplicate_every)
+    print(f"{total} contacts and {duplicates} near-duplicates in {args.database_url}")
+
+    for _ in range(args.repeat):
+        # Start every run from unnormalized rows, like a first run of the job.
+        with engine.begin() as conn:
+            conn.execute(update(Contact).values(email_normalized=None, phone_normalized=None, name_normalized=None))
+        db = SessionLocal()
+        start = time.perf_counter()
+        try:
+            if args.workers > 1:
+                with ProcessPoolExecutor(args.workers) as executor:
+                    report = find_duplicates(db, executor=executor, workers=args.workers)
+            else:
+                report = find_duplicates(db)
+        finally:
+            db.close()
+        print(f"{report} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Measure insert throughput with the contact indexes before and after the
+index audit (migration a7c4e2f9d3b8).
+
+    python -m benchmarks.inserts --rows 100000 --database-url postgresql://...
+
+The contacts table is dropped and recreated for each schema. "before" adds
+back the single-column indexes on id, name, phone and address that the audit
+dropped; the search migration's indexes are left out of both, as the audit
+does not change them. Single inserts go through create_contact, one commit
+each; batches go through the bulk import path.
+"""
+import time
+
+from sqlalchemy import text
+
+from app.db.base import Base
+from app.schemas.contact import ContactCreate
+from app.services.contact import create_contact, insert_ignoring_conflicts
+from benchmarks.common import base_parser, make_session, synthetic_contact
+
+# Indexes of the contacts table before the audit.
+LEGACY_INDEXES = (
+    "CREATE INDEX ix_contacts_id ON contacts (id)",
+    "CREATE INDEX ix_contacts_name ON contacts (name)",
+    "CREATE INDEX ix_contacts_phone ON contacts (phone)",
+    "CREATE INDEX ix_contacts_address ON contacts (address)",
+)
+
+
+def reset_schema(engine, legacy: bool):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    if legacy:
+        with engine.begin() as conn:
+            for statement in LEGACY_INDEXES:
+                conn.execute(text(statement))
+
+
+def measure(SessionLocal, single_rows: int, rows: int, batch_size: int) -> dict:
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        for i in range(single_rows):
+            create_contact(db, ContactCreate(**synthetic_contact(i)))
+        single_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for offset in range(single_rows, single_rows + rows, batch_size):
+            stop = min(offset + batch_size, single_rows + rows)
+            insert_ignoring_conflicts(db, [synthetic_contact(i) for i in range(offset, stop)])
+        batch_elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    return {
+        "single_rows_per_s": round(single_rows / single_elapsed),
+        "batch_rows_per_s": round(rows / batch_elapsed),
+    }
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows inserted in batches")
+    parser.add_argument("--single-rows", type=int, default=2000, help="Rows inserted one at a time")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_session(args.database_url)
+    results = {}
+    for schema in ("before", "after"):
+        reset_schema(engine, legacy=schema == "before")
+        results[schema] = measure(SessionLocal, args.single_rows, args.rows, args.batch_size)
+        print(f"{schema:>6}: {results[schema]}")
+    for key in results["after"]:
+        print(f"{key}: {results['after'][key] / results['before'][key]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Drive every contacts route at a fixed concurrency and report throughput and
+p50/p95/p99 latency per route, as text and as a JSON results file.
+
+Runs in-process against the ASGI app by default, using --database-url for
+storage, or against a running server with --base-url (seeding still goes
+through --database-url, which must be the server's database):
+
+    python -m benchmarks.load --rows 10000 --concurrency 16 --output results.json
+    python -m benchmarks.load --base-url http://localhost:8000 --database-url postgresql://...
+
+Compare two result files with benchmarks.compare.
+"""
+import asyncio
+import datetime
+import json
+import random
+import subprocess
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+import httpx
+
+from benchmarks.common import base_parser, latency_summary, make_session, seed_contacts
+
+
+@dataclass
+class Context:
+    rows: int
+    created_ids: List[int] = field(default_factory=list)
+    cursor: Optional[str] = None
+    changes_cursor: Optional[str] = None
+
+    def seeded_id(self) -> int:
+        return random.randint(1, self.rows)
+
+    def seeded_name(self) -> str:
+        return f"Contact {random.randrange(self.rows):08d}"
+
+    def created_sample(self, size: int) -> List[int]:
+        return random.sample(self.created_ids, min(size, len(self.created_ids)))
+
+
+def new_contact() -> dict:
+    token = uuid.uuid4().hex[:12]
+    return {
+        "name": f"Load {token}",
+        "email": f"load-{token}@example.com",
+        "phone": f"+1{random.randint(10**9, 10**10 - 1)}",
+        "address": f"{random.randint(1, 9999)} Load Avenue",
+    }
+
+
+def import_body() -> str:
+    lines = ["name,email,phone,address"]
+    for _ in range(100):
+        contact = new_contact()
+        lines.append(f"{contact['name']},{contact['email']},{contact['phone']},{contact['address']}")
+    return "\n".join(lines)
+
+
+@dataclass
+class Scenario:
+    name: str
+    # Builds the keyword arguments of client.request for the i-th request.
+    build: Callable[[Context], dict]
+    # Fraction of --requests issued for this scenario, for expensive routes.
+    share: float = 1.0
+    # Called with the response, e.g. to remember created ids.
+    record: Optional[Callable[[Context, httpx.Response], None]] = None
+
+
+def remember_created(ctx: Context, response: httpx.Response):
+    if response.status_code == 201:
+        ctx.created_ids.append(response.json()["id"])
+
+
+def remember_cursor(ctx: Context, response: httpx.Response):
+    ctx.cursor = response.headers.get("X-Next-Cursor")
+
+
+def remember_changes_cursor(ctx: Context, response: httpx.Response):
+    ctx.changes_cursor = response.headers.get("X-Next-Cursor") or ctx.changes_cursor
+
+
+def merge_body(ctx: Context) -> Optional[dict]:
+    # The duplicate is deleted by the merge, so it leaves created_ids.
+    if len(ctx.created_ids) < 2:
+        return None
+    duplicate_id = ctx.created_ids.pop()
+    return {"method": "POST", "url": "/contacts/merge",
+            "json": {"contact_id": random.choice(ctx.created_ids), "duplicate_ids": [duplicate_id]}}
+
+
+def batch_delete_body(ctx: Context) -> Optional[dict]:
+    # Small batches, so some contacts are left for the delete scenario.
+    ids = [ctx.created_ids.pop() for _ in range(min(10, len(ctx.created_ids)))]
+    if not ids:
+        return None
+    return {"method": "POST", "url": "/contacts/batch/delete", "json": {"items": [{"id": i} for i in ids]}}
+
+
+# Run in order; merge, batch_delete and delete consume the contacts made by create.
+SCENARIOS = [
+    Scenario("create", lambda ctx: {"method": "POST", "url": "/contacts/", "json": new_contact()},
+             record=remember_created),
+    Scenario("read", lambda ctx: {"method": "GET", "url": f"/contacts/{ctx.seeded_id()}"}),
+    Scenario("list_offset", lambda ctx: {
+        "method": "GET", "url": "/contacts/", "params": {"skip": random.randint(0, ctx.rows), "limit": 100}}),
+    Scenario("list_cursor", lambda ctx: {
+        "method": "GET", "url": "/contacts/", "params": {"limit": 100, **({"cursor": ctx.cursor} if ctx.cursor else {})}},
+             record=remember_cursor),
+    Scenario("search_prefix", lambda ctx: {
+        "method": "GET", "url": "/contacts/search", "params": {"q": ctx.seeded_name()[:12]}}),
+    # Drops the first letter, a typo that trigram similarity still matches.
+    Scenario("search_fuzzy", lambda ctx: {
+        "method": "GET", "url": "/contacts/search", "params": {"q": ctx.seeded_name()[1:], "mode": "fuzzy"}}),
+    Scenario("search_fulltext", lambda ctx: {
+        "method": "GET", "url": "/contacts/search", "params": {"q": f"{random.randint(1, ctx.rows)} Benchmark", "mode": "fulltext"}}),
+    Scenario("update", lambda ctx: {
+        "method": "PUT", "url": f"/contacts/{random.choice(ctx.created_ids)}", "json": new_contact()} if ctx.created_ids else None),
+    Scenario("patch", lambda ctx: {
+        "method": "PATCH", "url": f"/contacts/{random.choice(ctx.created_ids)}",
+        "json": {"address": new_contact()["address"]}} if ctx.created_ids else None),
+    Scenario("batch_get", lambda ctx: {
+        "method": "POST", "url": "/contacts/batch/get", "json": {"ids": [ctx.seeded_id() for _ in range(100)]}},
+             share=0.1),
+    Scenario("batch_update", lambda ctx: {
+        "method": "POST", "url": "/contacts/batch/update",
+        "json": {"items": [{"id": i, **new_contact()} for i in ctx.created_sample(100)]}} if ctx.created_ids else None,
+             share=0.1),
+    Scenario("changes", lambda ctx: {
+        "method": "GET", "url": "/contacts/changes",
+        "params": {"limit": 100, **({"cursor": ctx.changes_cursor} if ctx.changes_cursor else {})}},
+             record=remember_changes_cursor),
+    Scenario("duplicates", lambda ctx: {"method": "GET", "url": "/contacts/duplicates", "params": {"limit": 100}}),
+    Scenario("import", lambda ctx: {
+        "method": "POST", "url": "/contacts/import", "content": import_body(), "headers": {"Content-Type": "text/csv"}},
+             share=0.05),
+    Scenario("export", lambda ctx: {"method": "GET", "url": "/contacts/export"}, share=0.01),
+    Scenario("merge", merge_body, share=0.1),
+    Scenario("batch_delete", batch_delete_body, share=0.05),
+    # Stops early once every contact made by create is gone.
+    Scenario("delete", lambda ctx: {
+        "method": "DELETE", "url": f"/contacts/{ctx.created_ids.pop()}"} if ctx.created_ids else None),
+]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: Context, requests: int, concurrency: int) -> dict:
+    samples, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            kwargs = scenario.build(ctx)
+            if kwargs is None:
+                return
+            start = time.perf_counter()
+            response = await client.request(**kwargs)
+            samples.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+            if scenario.record:
+                scenario.record(ctx, response)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    if not samples:
+        return {"requests": 0, "errors": 0}
+    return {**latency_summary(samples, elapsed), "errors": errors}
+
+
+def in_process_client(database_url: str, api_prefix: str) -> httpx.AsyncClient:
+    from app.db.session import get_async_db, get_db, to_async_url
+    from app.main import app
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    _, SessionLocal = make_session(database_url)
+    AsyncSessionLocal = async_sessionmaker(create_async_engine(to_async_url(database_url)), expire_on_commit=False)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url=f"http://benchmark{api_prefix}", timeout=None)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> dict:
+    engine, _ = make_session(args.database_url)
+    rows = seed_contacts(engine, args.rows)
+    engine.dispose()
+    ctx = Context(rows=rows)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url.rstrip("/") + args.api_prefix, timeout=None)
+    else:
+        client = in_process_client(args.database_url, args.api_prefix)
+
+    selected = [scenario for scenario in SCENARIOS if not args.only or scenario.name in args.only]
+    results = {}
+    async with client:
+        for scenario in selected:
+            requests = max(1, int(args.requests * scenario.share))
+            results[scenario.name] = await run_scenario(client, scenario, ctx, requests, args.concurrency)
+            print(f"{scenario.name:>16}: {results[scenario.name]}")
+
+    return {
+        "label": args.label or git_revision(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "target": args.base_url or "in-process",
+        "database": engine.url.get_backend_name(),
+        "rows": rows,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=10_000, help="Contacts to seed before the run")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--only", nargs="*", help="Scenario names to run")
+    parser.add_argument("--label", help="Name of this run in the results, defaults to the git revision")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
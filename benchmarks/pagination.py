@@ -0,0 +1,46 @@
+"""
+Compare page latency of OFFSET pagination against keyset (cursor) pagination.
+
+    python -m benchmarks.pagination --rows 1000100 --database-url postgresql://...
+"""
+from app.core.pagination import encode_cursor
+from app.services import contact as contact_service
+from benchmarks.common import base_parser, make_session, seed_contacts, stopwatch, summarize
+
+OFFSETS = (0, 100_000, 1_000_000)
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=max(OFFSETS) + 100)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_session(args.database_url)
+    total = seed_contacts(engine, args.rows)
+    print(f"{total} contacts in {args.database_url}")
+
+    db = SessionLocal()
+    try:
+        for offset in OFFSETS:
+            if offset >= total:
+                print(f"offset {offset:>9}: skipped, only {total} rows")
+                continue
+            offset_samples, keyset_samples = [], []
+            # The cursor a client would hold after paging up to this offset.
+            previous = contact_service.get_contacts(db, max(offset - 1, 0), 1)
+            cursor = encode_cursor({"sort": "id", "id": previous[0].id}) if offset else None
+            for _ in range(args.repeat):
+                with stopwatch(offset_samples):
+                    contact_service.get_contacts(db, offset, args.limit)
+                with stopwatch(keyset_samples):
+                    contact_service.get_contacts_page(db, args.limit, cursor)
+                db.expunge_all()
+            print(f"offset {offset:>9}: offset {summarize(offset_samples)}")
+            print(f"{'':>17}keyset {summarize(keyset_samples)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Measure how throughput scales with the number of server worker processes.
+
+Starts the production server (app.server) on --database-url once per worker
+count and drives the read and list routes at a fixed concurrency:
+
+    python -m benchmarks.scaling --database-url postgresql://... --workers 1 2 4 8
+
+SQLite serializes writers and is a poor fit for several processes; use Postgres.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import base_parser, make_session, seed_contacts
+from benchmarks.load import SCENARIOS, Context, run_scenario
+
+SCALING_SCENARIOS = ("read", "list_cursor", "search_prefix")
+
+
+def start_server(database_url: str, workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        env=env,
+    )
+
+
+def wait_until_serving(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/docs").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+async def measure(base_url: str, rows: int, requests: int, concurrency: int) -> dict:
+    ctx = Context(rows=rows)
+    scenarios = [scenario for scenario in SCENARIOS if scenario.name in SCALING_SCENARIOS]
+    async with httpx.AsyncClient(base_url=f"{base_url}/api/v1", timeout=None) as client:
+        return {
+            scenario.name: await run_scenario(client, scenario, ctx, requests, concurrency)
+            for scenario in scenarios
+        }
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per route and worker count")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    engine, _ = make_session(args.database_url)
+    rows = seed_contacts(engine, args.rows)
+    engine.dispose()
+    print(f"{rows} contacts in {args.database_url}, {os.cpu_count()} CPUs")
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    baseline = {}
+    for workers in args.workers:
+        server = start_server(args.database_url, workers, args.port)
+        try:
+            wait_until_serving(base_url)
+            results = asyncio.run(measure(base_url, rows, args.requests, args.concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+        for name, result in results.items():
+            baseline.setdefault(name, result["throughput_rps"])
+            speedup = result["throughput_rps"] / baseline[name] if baseline[name] else 0
+            print(
+                f"{workers:>3} workers {name:>14}: {result['throughput_rps']:>8} req/s "
+                f"(x{speedup:.2f}), p99 {result['p99_ms']} ms, {result['errors']} errors"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare the cost of serializing a list response the default way (ORM
+instances, pydantic validation, jsonable_encoder and json.dumps) with the fast
+path (plain rows dumped by orjson), for 100, 1k and 10k contacts.
+
+    python -m benchmarks.serialization
+"""
+import json
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.models.contact import Contact
+from app.schemas.contact import Contact as ContactSchema
+from app.services import contact as contact_service
+from benchmarks.common import base_parser, make_session, seed_contacts, stopwatch, summarize
+
+SIZES = (100, 1_000, 10_000)
+
+contact_list = TypeAdapter(List[ContactSchema])
+
+
+def default_path(db, limit: int) -> bytes:
+    contacts = db.scalars(select(Contact).order_by(Contact.id).limit(limit)).all()
+    validated = contact_list.validate_python(contacts, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def fast_path(db, limit: int) -> bytes:
+    return contact_service.contacts_to_json(contact_service.get_contacts(db, 0, limit))
+
+
+def main():
+    args = base_parser(__doc__).parse_args()
+    engine, SessionLocal = make_session(args.database_url)
+    seed_contacts(engine, max(SIZES))
+
+    db = SessionLocal()
+    try:
+        for size in SIZES:
+            assert json.loads(default_path(db, size)) == json.loads(fast_path(db, size))
+            results = {}
+            for name, path in (("default", default_path), ("fast", fast_path)):
+                samples = []
+                for _ in range(args.repeat):
+                    with stopwatch(samples):
+                        path(db, size)
+                    db.expunge_all()
+                results[name] = summarize(samples)
+            speedup = results["default"]["median_ms"] / results["fast"]["median_ms"]
+            print(f"{size:>6} contacts: default {results['default']}")
+            print(f"{'':>17} fast    {results['fast']} ({speedup:.1f}x)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Run as a script from any directory.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings
+from app.db import session
+from app.services.contact_dedup import find_duplicates
+
+def main():
+    parser = argparse.ArgumentParser(description="Find probable duplicate contacts and store merge suggestions.")
+    parser.add_argument("--batch-size", type=int, default=settings.DEDUP_BATCH_SIZE)
+    parser.add_argument("--min-score", type=float, default=settings.DEDUP_MIN_SCORE)
+    parser.add_argument("--max-block-size", type=int, default=settings.DEDUP_MAX_BLOCK_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="Processes normalizing contacts, 1 to normalize inline")
+    args = parser.parse_args()
+
+    session.init_engines()
+    db = session.SessionLocal()
+    start = time.perf_counter()
+    try:
+        if args.workers > 1:
+            with ProcessPoolExecutor(args.workers) as executor:
+                report = find_duplicates(db, args.batch_size, args.min_score, args.max_block_size, executor, args.workers)
+        else:
+            report = find_duplicates(db, args.batch_size, args.min_score, args.max_block_size)
+    finally:
+        db.close()
+    print(f"{report} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
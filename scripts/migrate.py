@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+# Run as a script from any directory, like alembic with prepend_sys_path.
+sys.path.insert(0, str(ALEMBIC_INI.parent))
+
+from app.core.config import settings
+
+def migrate_if_needed(database_url: str) -> bool:
+    """
+    Upgrade the database to head, in this process, only when it is behind.
+    The check reads the revision files to find the head and runs one query;
+    when the database is current, it skips `alembic upgrade head`, which
+    would also run env.py, importing the models and opening a migration
+    context of its own, on each start.
+
+    Returns whether migrations were run.
+    """
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    engine = create_engine(database_url, poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            current = set(MigrationContext.configure(connection).get_current_heads())
+    finally:
+        engine.dispose()
+
+    if current == heads:
+        print(f"Database is at head {', '.join(sorted(heads))}, skipping migrations.")
+        return False
+    command.upgrade(config, "head")
+    return True
+
+if __name__ == "__main__":
+    migrate_if_needed(settings.DATABASE_URL)
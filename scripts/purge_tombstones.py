@@ -0,0 +1,27 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Run as a script from any directory.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings
+from app.db import session
+from app.services.contact_changes import purge_tombstones
+
+def main():
+    parser = argparse.ArgumentParser(description="Permanently delete contacts soft-deleted before the retention period.")
+    parser.add_argument("--retention-days", type=float, default=settings.TOMBSTONE_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    session.init_engines()
+    db = session.SessionLocal()
+    try:
+        purged = purge_tombstones(db, args.retention_days, args.batch_size)
+    finally:
+        db.close()
+    print(f"Purged {purged} deleted contacts")
+
+if __name__ == "__main__":
+    main()
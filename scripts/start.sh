@@ -1,10 +1,10 @@
 #!/bin/sh
 
 # Wait for the database to be ready
-python /code/scripts/wait_for_db.py
+python /code/scripts/wait_for_db.py || exit 1
 
-# Run database migrations
-alembic upgrade head
+# Run database migrations unless the database is already at head
+python /code/scripts/migrate.py
 
 # Execute the command passed to the docker container
 exec "$@"
\ No newline at end of file
@@ -1,33 +1,49 @@
+import os
+import sys
 import time
 import psycopg2
-import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def wait_for_db():
+# Exponential backoff between attempts, from FIRST_DELAY up to MAX_DELAY seconds.
+FIRST_DELAY = 0.05
+MAX_DELAY = 1.0
+
+def wait_for_db(timeout: float = 60, connect_timeout: int = 5) -> bool:
+    """
+    Retry connecting to the database with exponential backoff until it
+    accepts connections or timeout seconds have passed.
+    """
     dbname = os.getenv("POSTGRES_DB")
     user = os.getenv("POSTGRES_USER")
     password = os.getenv("POSTGRES_PASSWORD")
     host = os.getenv("POSTGRES_HOST")
-    
-    print('Waiting for database...')
-    print(f"dbname={dbname}, user={user}, password={password}, host={host}")
-    
+    port = os.getenv("POSTGRES_PORT", "5432")
+
+    print(f"Waiting for database {dbname} at {host}:{port}...")
+    deadline = time.monotonic() + timeout
+    delay = FIRST_DELAY
     while True:
         try:
             conn = psycopg2.connect(
                 dbname=dbname,
                 user=user,
                 password=password,
-                host=host
+                host=host,
+                port=port,
+                connect_timeout=connect_timeout,
             )
             conn.close()
             print("Database is ready!")
-            break
+            return True
         except psycopg2.OperationalError:
-            print("Database is not ready. Waiting...")
-            time.sleep(1)
+            if time.monotonic() + delay > deadline:
+                print(f"Database is not ready after {timeout}s, giving up.")
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_DELAY)
 
 if __name__ == "__main__":
-    wait_for_db()
\ No newline at end of file
+    timeout = float(os.getenv("WAIT_FOR_DB_TIMEOUT", "60"))
+    sys.exit(0 if wait_for_db(timeout, int(os.getenv("DB_CONNECT_TIMEOUT", "5"))) else 1)
@@ -1,12 +1,20 @@
+import csv
+import io
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+from app.core.timing import TimingMiddleware
 from app.db.base import Base
 from app.db.session import get_db
 from app.schemas.contact import ContactCreate
+from app.services.contact_dedup import find_duplicates
 
 # Setup test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -101,4 +109,340 @@ def test_delete_contact(sample_contact):
 # Test deleting a contact that does not exist
 def test_delete_contact_not_found():
     response = client.delete("/api/v1/contacts/9999")
-    assert response.status_code == 404  # Check if the response status code is 404 (Not Found)
\ No newline at end of file
+    assert response.status_code == 404  # Check if the response status code is 404 (Not Found)
+
+# Test walking the contact list with keyset cursors
+def test_read_contacts_cursor_pagination(sample_contact):
+    created_ids = []
+    for i in range(5):
+        contact = dict(sample_contact, name=f"Contact {i}", email=f"contact{i}@example.com")
+        created_ids.append(client.post("/api/v1/contacts/", json=contact).json()["id"])
+
+    response = client.get("/api/v1/contacts/", params={"limit": 2})
+    seen_ids = [c["id"] for c in response.json()]
+    while "X-Next-Cursor" in response.headers:
+        response = client.get("/api/v1/contacts/", params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]})
+        assert response.status_code == 200  # Check if the response status code is 200 (OK)
+        seen_ids.extend(c["id"] for c in response.json())
+
+    assert seen_ids == sorted(created_ids)  # Every contact is returned exactly once, in id order
+
+# Test paging by name with a cursor
+def test_read_contacts_cursor_sorted_by_name(sample_contact):
+    for name in ["Carol", "Alice", "Bob"]:
+        contact = dict(sample_contact, name=name, email=f"{name.lower()}@example.com")
+        client.post("/api/v1/contacts/", json=contact)
+
+    first_page = client.get("/api/v1/contacts/", params={"limit": 2, "sort": "name"})
+    assert [c["name"] for c in first_page.json()] == ["Alice", "Bob"]
+    second_page = client.get(
+        "/api/v1/contacts/",
+        params={"limit": 2, "sort": "name", "cursor": first_page.headers["X-Next-Cursor"]},
+    )
+    assert [c["name"] for c in second_page.json()] == ["Carol"]
+    assert "X-Next-Cursor" not in second_page.headers  # Last page has no next cursor
+
+# Test sending a malformed cursor
+def test_read_contacts_invalid_cursor():
+    response = client.get("/api/v1/contacts/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400  # Check if the response status code is 400 (Bad Request)
+    for position in ({"sort": "id", "id": "abc"}, {"sort": "name", "name": 1, "id": 1}, {"sort": "id", "id": True}):
+        response = client.get("/api/v1/contacts/", params={"cursor": encode_cursor(position), "sort": position["sort"]})
+        assert response.status_code == 400  # A tampered cursor is rejected before reaching the database
+
+# Test importing contacts from a CSV body
+def test_import_contacts_csv(sample_contact):
+    client.post("/api/v1/contacts/", json=sample_contact)
+    body = "\n".join([
+        "name,email,phone,address",
+        "Alice,alice@example.com,+111111111,1 First St",
+        "Bob,bob@example.com,+222222222,",
+        "Bad Phone,bad@example.com,12345,",
+        f"John Again,{sample_contact['email']},+333333333,",
+        "Alice Twin,alice@example.com,+444444444,",
+        "Carol,\"carol@example.com\",+555555555,\"3 Third St, Apt 4\"",
+    ])
+    response = client.post("/api/v1/contacts/import", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    data = response.json()
+    assert data["received"] == 6
+    assert data["inserted"] == 3  # Alice, Bob and Carol
+    assert [error["line"] for error in data["errors"]] == [4, 5, 6]  # Invalid phone and duplicate emails
+    assert "phone" in data["errors"][0]["error"]
+
+    carol = [c for c in client.get("/api/v1/contacts/").json() if c["name"] == "Carol"][0]
+    assert carol["address"] == "3 Third St, Apt 4"  # Quoted fields keep their commas
+
+# Test importing contacts from an NDJSON body
+def test_import_contacts_ndjson(sample_contact):
+    body = "\n".join([
+        '{"name": "Alice", "email": "alice@example.com", "phone": "+111111111"}',
+        "not json",
+        '{"name": "Bob", "email": "bob@example.com", "phone": "+222222222"}',
+        "",
+    ])
+    response = client.post("/api/v1/contacts/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+    data = response.json()
+    assert data["inserted"] == 2
+    assert data["failed"] == 1
+    assert data["errors"][0]["line"] == 2  # The line that is not JSON
+
+# Test importing with an unsupported content type
+def test_import_contacts_unsupported_type():
+    response = client.post("/api/v1/contacts/import", content="{}", headers={"Content-Type": "application/json"})
+    assert response.status_code == 415  # Check if the response status code is 415 (Unsupported Media Type)
+
+# Test exporting contacts as NDJSON
+def test_export_contacts_ndjson(sample_contact):
+    client.post("/api/v1/contacts/", json=sample_contact)
+    client.post("/api/v1/contacts/", json=dict(sample_contact, email="jane@example.com", name="Jane Doe"))
+
+    response = client.get("/api/v1/contacts/export")
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == ["John Doe", "Jane Doe"]
+    assert rows[0]["email"] == sample_contact["email"]
+
+# Test exporting contacts as CSV
+def test_export_contacts_csv(sample_contact):
+    client.post("/api/v1/contacts/", json=dict(sample_contact, address="1 Main St, Apt 2"))
+
+    response = client.get("/api/v1/contacts/export", params={"format": "csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["address"] == "1 Main St, Apt 2"  # Commas inside fields are quoted
+
+# Fixture to provide a few contacts to search through
+@pytest.fixture
+def searchable_contacts(sample_contact):
+    contacts = [
+        dict(sample_contact, name="Johnny Cash", email="cash@example.com", phone="+1555000111", address="1 Folsom Prison Road"),
+        dict(sample_contact, name="June Carter", email="june@example.com", phone="+1555000222", address="7 Ring of Fire Street"),
+        dict(sample_contact, name="Elvis Presley", email="elvis@graceland.com", phone="+1666000333", address="Graceland, Memphis"),
+    ]
+    for contact in contacts:
+        client.post("/api/v1/contacts/", json=contact)
+    return contacts
+
+# Test searching contacts by prefix
+def test_search_contacts_prefix(searchable_contacts):
+    response = client.get("/api/v1/contacts/search", params={"q": "jo"})
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    assert [c["name"] for c in response.json()] == ["Johnny Cash"]  # Case-insensitive prefix on name
+
+    response = client.get("/api/v1/contacts/search", params={"q": "+1555"})
+    assert [c["name"] for c in response.json()] == ["Johnny Cash", "June Carter"]  # Prefix on phone
+
+# Test fuzzy searching contacts
+def test_search_contacts_fuzzy(searchable_contacts):
+    response = client.get("/api/v1/contacts/search", params={"q": "graceland", "mode": "fuzzy"})
+    assert [c["name"] for c in response.json()] == ["Elvis Presley"]  # Matches inside the email
+
+# Test full-text search on the address
+def test_search_contacts_fulltext(searchable_contacts):
+    response = client.get("/api/v1/contacts/search", params={"q": "fire ring", "mode": "fulltext"})
+    assert [c["name"] for c in response.json()] == ["June Carter"]  # All words must appear in the address
+
+    response = client.get("/api/v1/contacts/search", params={"q": "%", "mode": "fulltext"})
+    assert response.json() == []  # LIKE wildcards are matched literally
+
+# Test searching with an invalid mode
+def test_search_contacts_invalid_mode():
+    response = client.get("/api/v1/contacts/search", params={"q": "jo", "mode": "regex"})
+    assert response.status_code == 422  # Check if the response status code is 422 (Unprocessable Entity)
+
+# Test that reads are served from the cache and writes invalidate it
+def test_read_contact_cache(sample_contact):
+    contact_id = client.post("/api/v1/contacts/", json=sample_contact).json()["id"]
+    hits_before = client.get("/api/v1/metrics/cache").json()["hits"]
+
+    client.get(f"/api/v1/contacts/{contact_id}")
+    client.get(f"/api/v1/contacts/{contact_id}")
+    assert client.get("/api/v1/metrics/cache").json()["hits"] == hits_before + 1  # Second read is a hit
+
+    client.put(f"/api/v1/contacts/{contact_id}", json=dict(sample_contact, name="Jane Doe"))
+    assert client.get(f"/api/v1/contacts/{contact_id}").json()["name"] == "Jane Doe"  # Update invalidated the entry
+
+    client.delete(f"/api/v1/contacts/{contact_id}")
+    assert client.get(f"/api/v1/contacts/{contact_id}").status_code == 404  # Delete invalidated the entry
+
+# Test conditional GET of a contact with If-None-Match
+def test_read_contact_not_modified(sample_contact):
+    contact_id = client.post("/api/v1/contacts/", json=sample_contact).json()["id"]
+    etag = client.get(f"/api/v1/contacts/{contact_id}").headers["ETag"]
+
+    response = client.get(f"/api/v1/contacts/{contact_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304  # Check if the response status code is 304 (Not Modified)
+    assert response.content == b""
+
+    client.put(f"/api/v1/contacts/{contact_id}", json=dict(sample_contact, name="Jane Doe"))
+    response = client.get(f"/api/v1/contacts/{contact_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200  # The contact changed, so the body is sent again
+    assert response.headers["ETag"] != etag
+
+# Test conditional GET of the contact list
+def test_read_contacts_not_modified(sample_contact):
+    client.post("/api/v1/contacts/", json=sample_contact)
+    etag = client.get("/api/v1/contacts/").headers["ETag"]
+    assert client.get("/api/v1/contacts/", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/api/v1/contacts/", json=dict(sample_contact, email="jane@example.com"))
+    assert client.get("/api/v1/contacts/", headers={"If-None-Match": etag}).status_code == 200
+
+# Test optimistic concurrency on update and delete with If-Match
+def test_update_contact_if_match(sample_contact):
+    create_response = client.post("/api/v1/contacts/", json=sample_contact)
+    contact_id = create_response.json()["id"]
+    etag = create_response.headers["ETag"]
+
+    first = client.put(f"/api/v1/contacts/{contact_id}", json=dict(sample_contact, name="Jane Doe"), headers={"If-Match": etag})
+    assert first.status_code == 200  # The ETag was current
+    second = client.put(f"/api/v1/contacts/{contact_id}", json=dict(sample_contact, name="Jim Doe"), headers={"If-Match": etag})
+    assert second.status_code == 412  # Check if the response status code is 412 (Precondition Failed)
+
+    assert client.delete(f"/api/v1/contacts/{contact_id}", headers={"If-Match": etag}).status_code == 412
+    assert client.delete(f"/api/v1/contacts/{contact_id}", headers={"If-Match": first.headers["ETag"]}).status_code == 200
+    assert client.put("/api/v1/contacts/9999", json=sample_contact, headers={"If-Match": '"9999.1"'}).status_code == 404
+
+# Test that responses report their SQL statements in Server-Timing
+def test_server_timing_counts_queries(sample_contact):
+    response = client.post("/api/v1/contacts/", json=sample_contact)
+    assert 'db;dur=' in response.headers["Server-Timing"]
+    assert '"1 queries"' in response.headers["Server-Timing"]  # A create is a single INSERT ... RETURNING
+
+    response = client.get(f"/api/v1/contacts/{response.json()['id']}")
+    assert "total;dur=" in response.headers["Server-Timing"]
+
+# Test that slow requests are logged with their SQL
+def test_slow_request_logged(sample_contact, caplog):
+    contact_id = client.post("/api/v1/contacts/", json=sample_contact).json()["id"]
+    slow_client = TestClient(TimingMiddleware(app.router, slow_request_ms=0))  # Every request counts as slow
+
+    slow_client.get(f"/api/v1/contacts/{contact_id}")
+    assert "Slow request GET /api/v1/contacts/" in caplog.text
+    assert "FROM contacts" in caplog.text  # The SQL of the request is logged
+
+# Test fetching many contacts by id in one request
+def test_read_contacts_batch(sample_contact):
+    first = client.post("/api/v1/contacts/", json=sample_contact).json()["id"]
+    second = client.post("/api/v1/contacts/", json=dict(sample_contact, email="jane@example.com")).json()["id"]
+
+    response = client.post("/api/v1/contacts/batch/get", json={"ids": [second, 9999, first]})
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    assert [contact["id"] for contact in response.json()["contacts"]] == [second, first]  # Request order is kept
+    assert response.json()["missing"] == [9999]
+
+# Test updating many contacts with a result per item
+def test_update_contacts_batch(sample_contact):
+    first = client.post("/api/v1/contacts/", json=sample_contact).json()
+    second = client.post("/api/v1/contacts/", json=dict(sample_contact, email="jane@example.com")).json()
+
+    response = client.post("/api/v1/contacts/batch/update", json={"items": [
+        dict(sample_contact, id=first["id"], name="John Updated", version=1),
+        dict(sample_contact, id=second["id"]),  # Email of the first contact
+        dict(sample_contact, id=second["id"], email="jane@example.com", version=5),
+        dict(sample_contact, id=9999, email="nobody@example.com"),
+    ]})
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    assert [result["status"] for result in response.json()["results"]] == [200, 400, 412, 404]
+    assert response.json()["results"][0]["contact"]["name"] == "John Updated"
+    assert client.get(f"/api/v1/contacts/{first['id']}").json()["name"] == "John Updated"  # The failed items did not roll back the rest
+
+# Test deleting many contacts with a result per item
+def test_delete_contacts_batch(sample_contact):
+    first = client.post("/api/v1/contacts/", json=sample_contact).json()["id"]
+    second = client.post("/api/v1/contacts/", json=dict(sample_contact, email="jane@example.com")).json()["id"]
+
+    response = client.post("/api/v1/contacts/batch/delete", json={"items": [
+        {"id": first}, {"id": second, "version": 2}, {"id": 9999},
+    ]})
+    assert [result["status"] for result in response.json()["results"]] == [200, 412, 404]
+    assert client.get(f"/api/v1/contacts/{first}").status_code == 404
+    assert client.get(f"/api/v1/contacts/{second}").status_code == 200
+
+# Test a partial update that changes only the fields sent
+def test_patch_contact(sample_contact):
+    create_response = client.post("/api/v1/contacts/", json=sample_contact)
+    contact_id = create_response.json()["id"]
+
+    response = client.patch(f"/api/v1/contacts/{contact_id}", json={"name": "Jane Doe"})
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    assert response.json() == dict(sample_contact, id=contact_id, name="Jane Doe")  # The other fields are kept
+    assert response.headers["ETag"] != create_response.headers["ETag"]
+
+    unchanged = client.patch(f"/api/v1/contacts/{contact_id}", json={"name": "Jane Doe"}, headers={"If-Match": response.headers["ETag"]})
+    assert unchanged.status_code == 200
+    assert unchanged.headers["ETag"] == response.headers["ETag"]  # Nothing changed, so nothing was written
+    assert client.patch(f"/api/v1/contacts/{contact_id}", json={}, headers={"If-Match": create_response.headers["ETag"]}).status_code == 412
+
+    assert client.patch(f"/api/v1/contacts/{contact_id}", json={"address": None}).json()["address"] is None  # Address can be cleared
+    assert client.patch(f"/api/v1/contacts/{contact_id}", json={"name": None}).status_code == 422  # Required fields cannot
+    assert client.patch("/api/v1/contacts/9999", json={"name": "Nobody"}).status_code == 404
+
+# Test the total count header with each counting strategy
+def test_read_contacts_total_count(sample_contact):
+    client.post("/api/v1/contacts/", json=sample_contact)
+    for strategy in ("exact", "estimated", "counter"):
+        response = client.get("/api/v1/contacts/", params={"count": strategy, "limit": 1})
+        assert response.headers["X-Total-Count"] == "1"  # SQLite estimates by counting exactly
+
+    contact_id = client.post("/api/v1/contacts/", json=dict(sample_contact, email="jane@example.com")).json()["id"]
+    assert client.get("/api/v1/contacts/", params={"count": "counter"}).headers["X-Total-Count"] == "2"  # Creates adjust the counter
+    client.delete(f"/api/v1/contacts/{contact_id}")
+    assert client.get("/api/v1/contacts/", params={"count": "counter"}).headers["X-Total-Count"] == "1"  # And so do deletes
+    assert "X-Total-Count" not in client.get("/api/v1/contacts/").headers  # Counting is opt-in
+
+# Test listing merge suggestions and merging duplicates through the API
+def test_merge_duplicates(sample_contact):
+    first = client.post("/api/v1/contacts/", json=sample_contact).json()["id"]
+    second = client.post("/api/v1/contacts/", json=dict(sample_contact, name="john  DOE", email="JOHN@example.com")).json()["id"]
+    find_duplicates(TestingSessionLocal())
+
+    suggestions = client.get("/api/v1/contacts/duplicates").json()
+    assert [(s["contact"]["id"], s["duplicate"]["id"]) for s in suggestions] == [(first, second)]
+
+    assert client.post("/api/v1/contacts/merge", json={"contact_id": first, "duplicate_ids": [first]}).status_code == 400
+    assert client.post("/api/v1/contacts/merge", json={"contact_id": first, "duplicate_ids": [9999]}).status_code == 404
+    response = client.post("/api/v1/contacts/merge", json={"contact_id": first, "duplicate_ids": [second]})
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    assert client.get(f"/api/v1/contacts/{second}").status_code == 404  # The duplicate is gone
+    assert client.get("/api/v1/contacts/duplicates").json() == []
+
+# Test syncing creates, updates and deletes through the change feed
+def test_read_changes(sample_contact, monkeypatch):
+    monkeypatch.setattr(settings, "CHANGE_FEED_LAG_SECONDS", 0)
+    first = client.post("/api/v1/contacts/", json=sample_contact).json()["id"]
+    second = client.post("/api/v1/contacts/", json=dict(sample_contact, email="jane@example.com")).json()["id"]
+
+    response = client.get("/api/v1/contacts/changes", params={"limit": 1})
+    assert [change["id"] for change in response.json()] == [first]
+    response = client.get("/api/v1/contacts/changes", params={"cursor": response.headers["X-Next-Cursor"]})
+    assert [change["id"] for change in response.json()] == [second]
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/api/v1/contacts/changes", params={"cursor": cursor})
+    assert response.json() == []
+    assert response.headers["X-Next-Cursor"] == cursor  # Nothing new, poll again from the same place
+
+    client.delete(f"/api/v1/contacts/{first}")
+    changes = client.get("/api/v1/contacts/changes", params={"cursor": cursor}).json()
+    assert [(change["id"], change["deleted"]) for change in changes] == [(first, True)]
+    assert client.get(f"/api/v1/contacts/{first}").status_code == 404
+    assert client.post("/api/v1/contacts/", json=sample_contact).status_code == 201  # The email is free again
+
+    monkeypatch.setattr(settings, "TOMBSTONE_RETENTION_DAYS", 0)
+    assert client.get("/api/v1/contacts/changes", params={"cursor": cursor}).status_code == 410
+    assert client.get("/api/v1/contacts/changes", params={"cursor": "not-a-cursor"}).status_code == 400
+
+# Test that retrying a create with the same Idempotency-Key returns the original contact
+def test_create_contact_idempotency_key(sample_contact):
+    headers = {"Idempotency-Key": "create-john"}
+    first = client.post("/api/v1/contacts/", json=sample_contact, headers=headers)
+    retry = client.post("/api/v1/contacts/", json=sample_contact, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["ETag"] == first.headers["ETag"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert client.post("/api/v1/contacts/", json=sample_contact).status_code == 400  # Without the key it is a new create
+    assert client.post("/api/v1/contacts/", json=dict(sample_contact, name="Other"), headers=headers).status_code == 422
@@ -0,0 +1,68 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.v1 import contacts, contacts_async
+from app.api.v1.contacts_async import with_async_routes
+from app.db.session import get_async_db
+
+# Setup the async test database on the same file as the sync tests
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Override the get_async_db dependency to use the test database
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+# Build an app that serves the contact routes the way USE_ASYNC_DB does
+app = FastAPI()
+app.include_router(with_async_routes(contacts.router), prefix="/api/v1/contacts")
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+client = TestClient(app)
+
+@pytest.fixture
+def sample_contact():
+    return {
+        "name": "John Doe",
+        "email": "john@example.com",
+        "phone": "+1234567890",
+        "address": "123 Main St"
+    }
+
+# Test that the async handlers replace the sync ones
+def test_async_routes_replace_sync_routes():
+    served = {(route.path, frozenset(route.methods)): route.endpoint for route in app.routes}
+    for route in contacts_async.router.routes:
+        # Every CRUD route is served by the async handler
+        assert served[("/api/v1/contacts" + route.path, frozenset(route.methods))] is route.endpoint
+
+# Test the full CRUD cycle through the async handlers
+def test_async_crud(sample_contact):
+    create_response = client.post("/api/v1/contacts/", json=sample_contact)
+    assert create_response.status_code == 201  # Check if the response status code is 201 (Created)
+    contact_id = create_response.json()["id"]
+
+    duplicate_response = client.post("/api/v1/contacts/", json=sample_contact)
+    assert duplicate_response.status_code == 400  # Duplicate email is rejected
+
+    assert client.get(f"/api/v1/contacts/{contact_id}").json()["name"] == sample_contact["name"]
+    assert [c["id"] for c in client.get("/api/v1/contacts/").json()] == [contact_id]
+
+    updated_data = dict(sample_contact, name="Jane Doe")
+    update_response = client.put(f"/api/v1/contacts/{contact_id}", json=updated_data)
+    assert update_response.json()["name"] == "Jane Doe"  # Verify the updated name in the response
+    patch_response = client.patch(f"/api/v1/contacts/{contact_id}", json={"address": "1 New St"})
+    assert patch_response.json() == dict(updated_data, id=contact_id, address="1 New St")  # Only the address changed
+
+    assert client.delete(f"/api/v1/contacts/{contact_id}").status_code == 200
+    assert client.get(f"/api/v1/contacts/{contact_id}").status_code == 404  # Contact is gone
+
+# Test reading and updating a contact that does not exist
+def test_async_contact_not_found(sample_contact):
+    assert client.get("/api/v1/contacts/9999").status_code == 404
+    assert client.put("/api/v1/contacts/9999", json=sample_contact).status_code == 404
@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import get_db
+from app.main import app
+
+client = TestClient(app)
+
+# Test the liveness probe
+def test_read_liveness():
+    response = client.get("/api/v1/health/live")
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    assert response.json() == {"status": "ok"}
+
+# Test the readiness probe against a reachable database
+def test_read_readiness(test_db, monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: test_db)
+    response = client.get("/api/v1/health/ready")
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    assert response.json() == {"status": "ready"}
+
+# Test the readiness probe when the database cannot be reached
+def test_read_readiness_database_down(tmp_path, monkeypatch):
+    unreachable = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path}/missing/contacts.db"))
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: unreachable())
+    response = client.get("/api/v1/health/ready")
+    assert response.status_code == 503  # Check if the response status code is 503 (Service Unavailable)
@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+# Test reading the connection pool telemetry
+def test_read_pool_metrics():
+    response = client.get("/api/v1/metrics/pool")
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    data = response.json()["sync"]
+    assert {"pool_size", "checked_out", "overflow", "wait_seconds", "checkout_latency_seconds"} <= data.keys()
+    assert "idempotency" in response.json()
+
+# Test reading the per-route request histograms
+def test_read_request_metrics():
+    client.get("/api/v1/metrics/cache")
+    response = client.get("/api/v1/metrics/requests")
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{route="GET /api/v1/metrics/cache"}' in response.text
+    assert "# TYPE http_request_queries histogram" in response.text
+
+# Test reading the admission counters after a contact request
+def test_read_admission_metrics():
+    client.get("/api/v1/contacts/")
+    response = client.get("/api/v1/metrics/admission")
+    assert response.status_code == 200  # Check if the response status code is 200 (OK)
+    data = response.json()
+    assert data["admitted"] >= 1
+    assert data["in_flight"] == 0  # Released once the request finished
+    assert {"rate_limited", "shed_queue_full", "shed_timeout", "queued", "max_in_flight"} <= data.keys()
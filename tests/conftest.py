@@ -15,6 +15,22 @@ from app.main import app
 from app.db.base import Base
 from app.db.session import get_db
 from app.core.config import settings
+from app.services.contact import contact_cache, contact_counter
+
+class FakeClock:
+    """
+    Clock to pass where a component takes one, advanced by setting now.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
 
 # Use an in-memory SQLite database for testing
 TEST_DATABASE_URL = "sqlite:///./test.db"
@@ -94,6 +110,8 @@ def override_settings():
 def clear_db():
     yield
     
+    contact_cache.clear()
+    contact_counter.clear()
     engine = create_engine("sqlite:///./test.db")
     SessionLocal = sessionmaker(bind=engine)
     db = SessionLocal()
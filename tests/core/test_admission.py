@@ -0,0 +1,199 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.admission import (
+    ADMITTED,
+    QUEUE_FULL,
+    TIMED_OUT,
+    AdmissionGate,
+    AdmissionMetrics,
+    AdmissionMiddleware,
+    ClientIdentifier,
+    NullRateLimiter,
+    TokenBucketLimiter,
+    build_rate_limiter,
+    parse_api_keys,
+)
+from app.core.idempotency import IdempotencyMiddleware, MemoryIdempotencyStore
+from app.main import app
+
+
+async def slow_app(scope, receive, send):
+    await anyio.sleep(0.3)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def test_token_bucket_refills(clock):
+    """
+    Test that a client can burst up to the bucket size and is then limited to the refill rate.
+
+    Steps:
+    1. Take the whole burst, then assert that the next request must wait for one refill.
+    2. Advance the clock by one refill and assert that one more request is allowed.
+    3. Assert that other clients have their own bucket.
+    """
+    limiter = TokenBucketLimiter(rate=2, burst=3, clock=clock)
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == pytest.approx(0.5)
+    clock.now = 0.5
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("b") == 0.0
+
+
+def test_token_bucket_forgets_oldest_clients(clock):
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_clients=2, clock=clock)
+    for client in ("a", "b", "c"):
+        limiter.acquire(client)
+    assert len(limiter) == 2
+    assert limiter.acquire("a") == 0.0  # Forgotten, so it starts with a full bucket again
+
+
+def test_build_rate_limiter():
+    assert isinstance(build_rate_limiter("memory", 1, 1), TokenBucketLimiter)
+    assert isinstance(build_rate_limiter("none", 1, 1), NullRateLimiter)
+    with pytest.raises(ValueError):
+        build_rate_limiter("redis", 1, 1)
+
+
+def test_admission_gate_queues_and_sheds():
+    """
+    Test that the gate admits up to its limit, queues a bounded number of
+    requests in order and turns the rest away.
+    """
+    gate = AdmissionGate(max_in_flight=1, max_queue=1, queue_timeout=5)
+    outcomes = []
+
+    async def main():
+        assert await gate.acquire() == ADMITTED
+        async with anyio.create_task_group() as tasks:
+            async def queued():
+                outcomes.append(await gate.acquire())
+                gate.release()
+            tasks.start_soon(queued)
+            await anyio.sleep(0.01)
+            assert gate.queued == 1
+            assert await gate.acquire() == QUEUE_FULL
+            gate.release()  # Hands the slot to the queued request
+        assert gate.in_flight == 0
+
+    anyio.run(main)
+    assert outcomes == [ADMITTED]
+
+
+def test_admission_gate_times_out():
+    gate = AdmissionGate(max_in_flight=1, max_queue=10, queue_timeout=0.05)
+
+    async def main():
+        await gate.acquire()
+        assert await gate.acquire() == TIMED_OUT
+        assert gate.queued == 0
+        gate.release()
+        assert gate.in_flight == 0
+
+    anyio.run(main)
+
+
+def test_middleware_rate_limits_per_client():
+    """
+    Test that clients are limited by IP, and that an X-API-Key only gets its
+    own bucket when it is a configured key.
+    """
+    metrics = AdmissionMetrics()
+    limiter = TokenBucketLimiter(rate=0.1, burst=1)
+    gate = AdmissionGate(max_in_flight=10, max_queue=10, queue_timeout=1)
+    client_id = ClientIdentifier(api_keys=["known"])
+    client = TestClient(AdmissionMiddleware(slow_app, limiter, gate, ["/contacts"], metrics, client_id))
+
+    assert client.get("/contacts/").status_code == 200
+    response = client.get("/contacts/")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
+    assert client.get("/contacts/", headers={"X-API-Key": "made-up"}).status_code == 429  # Still the IP's bucket
+    assert client.get("/contacts/", headers={"X-API-Key": "known"}).status_code == 200  # Its own bucket
+    assert client.get("/health/live").status_code == 200  # Outside the limited paths
+    assert metrics.rate_limited.value == 2
+
+
+def test_client_identifier():
+    scope = {"headers": [(b"x-api-key", b"abc")], "client": ("10.0.0.1", 1234)}
+    assert ClientIdentifier()(scope) == "ip:10.0.0.1"
+    assert ClientIdentifier().api_key(scope) is None
+    assert ClientIdentifier(api_keys=["abc"])(scope) == "key:abc"
+    assert ClientIdentifier(trust_api_key_header=True)(scope) == "key:abc"
+    assert parse_api_keys(" a, b ,,") == ["a", "b"]
+
+
+def test_middleware_sheds_load():
+    """
+    Test that requests beyond the in-flight limit and the queue get 503 with
+    Retry-After instead of waiting, and are counted.
+
+    Steps:
+    1. Fire four parallel requests at a slow app behind a gate admitting one and queueing one.
+    2. Assert that two were served and two were shed as queue full.
+    """
+    metrics = AdmissionMetrics()
+    gate = AdmissionGate(max_in_flight=1, max_queue=1, queue_timeout=5)
+    client = TestClient(AdmissionMiddleware(slow_app, NullRateLimiter(), gate, ["/contacts"], metrics))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(lambda _: client.get("/contacts/"), range(4)))
+    assert sorted(response.status_code for response in responses) == [200, 200, 503, 503]
+    assert all(response.headers["Retry-After"] == "5" for response in responses if response.status_code == 503)
+    assert (metrics.admitted.value, metrics.shed_queue_full.value) == (2, 2)
+    assert (gate.in_flight, gate.queued) == (0, 0)
+
+
+def test_idempotent_retries_hold_no_gate_slot():
+    """
+    Test that a storm of retries with one Idempotency-Key, waiting on the
+    request in flight, does not take the admission gate from other requests.
+
+    Steps:
+    1. Wrap a gate with room for two requests in the idempotency middleware, as in the app.
+    2. Fire eight retries with the same key, then a request without one.
+    3. Assert that every request was served and the retries took a single slot.
+    """
+    gate = AdmissionGate(max_in_flight=2, max_queue=0, queue_timeout=5)
+    metrics = AdmissionMetrics()
+    admission = AdmissionMiddleware(slow_app, NullRateLimiter(), gate, ["/contacts"], metrics)
+    client = TestClient(IdempotencyMiddleware(admission, MemoryIdempotencyStore(ttl=60), paths=["/contacts/"]))
+
+    with ThreadPoolExecutor(max_workers=9) as executor:
+        retries = [
+            executor.submit(client.post, "/contacts/", json={}, headers={"Idempotency-Key": "storm"}) for _ in range(8)
+        ]
+        time.sleep(0.1)
+        other = executor.submit(client.post, "/contacts/", json={})
+        assert other.result().status_code == 200
+        assert [retry.result().status_code for retry in retries] == [200] * 8
+    assert (metrics.admitted.value, metrics.shed_queue_full.value) == (2, 0)
+
+
+def test_rate_limited_request_is_not_stored(clock):
+    """
+    Test that a POST rejected by the rate limiter does not store its 429
+    under its Idempotency-Key, so the retry once the bucket has refilled
+    reaches the app.
+    """
+    gate = AdmissionGate(max_in_flight=2, max_queue=0, queue_timeout=5)
+    limiter = TokenBucketLimiter(rate=1, burst=1, clock=clock)
+    admission = AdmissionMiddleware(slow_app, limiter, gate, ["/contacts"], AdmissionMetrics())
+    client = TestClient(IdempotencyMiddleware(admission, MemoryIdempotencyStore(ttl=60), paths=["/contacts/"]))
+
+    assert client.post("/contacts/", json={}).status_code == 200  # Empties the bucket
+    assert client.post("/contacts/", json={}, headers={"Idempotency-Key": "k"}).status_code == 429
+    clock.now = 1
+    retry = client.post("/contacts/", json={}, headers={"Idempotency-Key": "k"})
+    assert (retry.status_code, retry.text) == (200, "ok")
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+def test_app_checks_idempotency_outside_the_gate():
+    order = [middleware.cls for middleware in app.user_middleware]
+    assert order.index(IdempotencyMiddleware) < order.index(AdmissionMiddleware)
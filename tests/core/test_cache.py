@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from app.core.cache import LRUCache, NullCache, RedisCache, TTLCounter, build_cache
+
+
+class FakeRedis:
+    """
+    Local stand-in for redis.Redis covering the calls RedisCache makes.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expiries = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+        self.expiries[key] = ex
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return [key for key in list(self.data) if key.startswith(prefix)]
+
+
+def test_lru_cache_hits_and_misses(clock):
+    cache = LRUCache(max_entries=10, ttl=60, clock=clock)
+    assert cache.get("a") is None
+    cache.set("a", {"id": 1})
+    assert cache.get("a") == {"id": 1}
+    assert cache.stats.snapshot() == {"hits": 1, "misses": 1, "evictions": 0, "hit_ratio": 0.5}
+
+
+def test_lru_cache_evicts_least_recently_used(clock):
+    """
+    Test that the least recently used entry is evicted when the cache is full.
+
+    Steps:
+    1. Fill a two-entry cache and read the first entry so the second one becomes the oldest.
+    2. Add a third entry.
+    3. Assert that the second entry was evicted and counted.
+    """
+    cache = LRUCache(max_entries=2, ttl=60, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats.evictions.value == 1
+
+
+def test_lru_cache_expires_entries(clock):
+    cache = LRUCache(max_entries=10, ttl=60, clock=clock)
+    cache.set("a", 1)
+    clock.now = 61
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats.evictions.value == 1
+
+
+def test_redis_cache_with_stand_in():
+    """
+    Test the shared cache backend against a local stand-in for Redis.
+
+    Steps:
+    1. Store an entry and assert that it is written as JSON with the TTL and key prefix.
+    2. Read it back as a hit, then delete it and read it as a miss.
+    """
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=30)
+    cache.set("contact:1", {"id": 1, "name": "John"})
+    assert json.loads(client.data["contacts:contact:1"]) == {"id": 1, "name": "John"}
+    assert client.expiries["contacts:contact:1"] == 30
+    assert cache.get("contact:1") == {"id": 1, "name": "John"}
+    cache.delete("contact:1")
+    assert cache.get("contact:1") is None
+    assert (cache.stats.hits.value, cache.stats.misses.value) == (1, 1)
+
+
+def test_build_cache():
+    assert isinstance(build_cache("memory", 60, 100), LRUCache)
+    assert isinstance(build_cache("none", 60, 100), NullCache)
+    with pytest.raises(ValueError):
+        build_cache("memcached", 60, 100)
+
+
+def test_ttl_counter_expires(clock):
+    """
+    Test that the counter is adjusted in place until its TTL runs out.
+    """
+    counter = TTLCounter(ttl=10, clock=clock)
+    assert counter.value() is None
+    counter.adjust(1)  # Nothing to adjust before the first reset
+    assert counter.value() is None
+
+    counter.reset(5)
+    counter.adjust(2)
+    assert counter.value() == 7
+    clock.now += 10
+    assert counter.value() is None  # Reload from the source
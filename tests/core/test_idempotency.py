@@ -0,0 +1,164 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+from fastapi.testclient import TestClient
+
+from app.core.admission import ClientIdentifier
+from app.core.idempotency import IdempotencyMiddleware, MemoryIdempotencyStore, request_fingerprint
+
+
+class CountingApp:
+    """
+    ASGI app that answers with the number of times it was called, after an
+    optional delay, or with a 500 while fail is set.
+    """
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.fail = False
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        await receive()
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        await anyio.sleep(self.delay)
+        status = 500 if self.fail else 201
+        await send({"type": "http.response.start", "status": status, "headers": [(b"etag", f'"{calls}"'.encode())]})
+        await send({"type": "http.response.body", "body": str(calls).encode()})
+
+
+class CountingStore(MemoryIdempotencyStore):
+    def __init__(self, ttl: float):
+        super().__init__(ttl)
+        self.gets = 0
+
+    def get(self, key: str):
+        self.gets += 1
+        return super().get(key)
+
+
+def idempotent_client(app, store=None, **options) -> TestClient:
+    store = store or MemoryIdempotencyStore(ttl=60)
+    return TestClient(IdempotencyMiddleware(app, store, paths=["/contacts/"], **options))
+
+
+def test_memory_store_expires_keys(clock):
+    store = MemoryIdempotencyStore(ttl=60, clock=clock)
+    assert store.reserve("a", "fingerprint") is None
+    assert store.reserve("a", "fingerprint").in_flight
+    store.complete("a", 201, [("etag", '"1"')], b"{}")
+    assert store.get("a").status == 201
+    clock.now = 61
+    assert store.get("a") is None
+    assert len(store) == 0
+
+
+def test_request_fingerprint_ignores_json_formatting():
+    assert request_fingerprint("POST", "/contacts/", b'{"a": 1, "b": 2}') == request_fingerprint("POST", "/contacts/", b'{"b":2,"a":1}')
+    assert request_fingerprint("POST", "/contacts/", b'{"a": 1}') != request_fingerprint("POST", "/contacts/", b'{"a": 2}')
+    assert request_fingerprint("POST", "/contacts/", b'{"a": 1}') != request_fingerprint("POST", "/other/", b'{"a": 1}')
+
+
+def test_retry_replays_response():
+    """
+    Test that a retry with the same key gets the stored response without
+    reaching the app, and that a different body with that key is rejected.
+    """
+    app = CountingApp()
+    client = idempotent_client(app)
+    first = client.post("/contacts/", json={"name": "John"}, headers={"Idempotency-Key": "k1"})
+    retry = client.post("/contacts/", json={"name": "John"}, headers={"Idempotency-Key": "k1"})
+    assert (retry.status_code, retry.text, retry.headers["ETag"]) == (first.status_code, first.text, first.headers["ETag"])
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert app.calls == 1
+
+    assert client.post("/contacts/", json={"name": "Jane"}, headers={"Idempotency-Key": "k1"}).status_code == 422
+    assert client.post("/contacts/", json={"name": "John"}, headers={"Idempotency-Key": "k2"}).text == "2"
+    assert client.post("/contacts/", json={"name": "John"}).text == "3"  # Requests without a key are not deduplicated
+    assert client.post("/contacts/", json={"name": "John"}, headers={"Idempotency-Key": "x" * 256}).status_code == 400
+
+
+def test_concurrent_retries_collapse_into_one_call():
+    """
+    Test that requests arriving while the first one with the same key is
+    still being served wait for its response instead of calling the app.
+
+    Steps:
+    1. Fire several requests with the same key in parallel at an app that takes a while to answer.
+    2. Assert that the app was called once and every request got its response.
+    """
+    app = CountingApp(delay=0.2)
+    client = idempotent_client(app)
+
+    def post(_):
+        return client.post("/contacts/", json={"name": "John"}, headers={"Idempotency-Key": "storm"})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(post, range(8)))
+    assert app.calls == 1
+    assert {(response.status_code, response.text) for response in responses} == {(201, "1")}
+
+
+def test_keys_are_scoped_to_trusted_api_keys():
+    """
+    Test that keys sent with a trusted API key are scoped to it, while keys
+    sent without one are shared, so a retry replays wherever it comes from.
+    """
+    app = CountingApp()
+    client = idempotent_client(app, client_id=ClientIdentifier(api_keys=["a", "b"]))
+    first = client.post("/contacts/", json={}, headers={"Idempotency-Key": "k", "X-API-Key": "a"})
+    other = client.post("/contacts/", json={}, headers={"Idempotency-Key": "k", "X-API-Key": "b"})
+    assert (first.text, other.text) == ("1", "2")
+    assert "Idempotent-Replayed" not in other.headers
+    assert client.post("/contacts/", json={}, headers={"Idempotency-Key": "k", "X-API-Key": "a"}).text == "1"
+
+    anonymous = client.post("/contacts/", json={}, headers={"Idempotency-Key": "shared"})
+    untrusted = client.post("/contacts/", json={}, headers={"Idempotency-Key": "shared", "X-API-Key": "made-up"})
+    assert (anonymous.text, untrusted.text) == ("3", "3")
+    assert untrusted.headers["Idempotent-Replayed"] == "true"
+
+
+def test_in_flight_wait_backs_off():
+    """
+    Test that a request waiting on one in flight polls the store less and
+    less often: 50ms doubling up to 200ms over a one second wait is 7 polls,
+    where a fixed 50ms would take 20.
+    """
+    app = CountingApp(delay=1)
+    store = CountingStore(ttl=60)
+    client = idempotent_client(app, store, max_poll_seconds=0.2)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(client.post, "/contacts/", json={}, headers={"Idempotency-Key": "slow"})
+        time.sleep(0.05)
+        second = executor.submit(client.post, "/contacts/", json={}, headers={"Idempotency-Key": "slow"})
+        assert second.result().text == first.result().text == "1"
+    assert store.gets <= 8
+
+
+def test_in_flight_wait_times_out():
+    app = CountingApp(delay=0.5)
+    client = idempotent_client(app, wait_seconds=0.1)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(client.post, "/contacts/", json={}, headers={"Idempotency-Key": "slow"})
+        time.sleep(0.1)
+        second = executor.submit(client.post, "/contacts/", json={}, headers={"Idempotency-Key": "slow"})
+        assert second.result().status_code == 409
+        assert second.result().headers["Retry-After"] == "1"
+        assert first.result().status_code == 201
+
+
+def test_failed_request_is_not_stored():
+    app = CountingApp()
+    client = idempotent_client(app)
+    app.fail = True
+    assert client.post("/contacts/", json={}, headers={"Idempotency-Key": "k"}).status_code == 500
+    app.fail = False
+    assert client.post("/contacts/", json={}, headers={"Idempotency-Key": "k"}).status_code == 201  # Served again
+    assert app.calls == 2
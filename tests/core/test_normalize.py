@@ -0,0 +1,25 @@
+from app.core.normalize import normalize_email, normalize_name, normalize_phone
+
+
+def test_normalize_email():
+    assert normalize_email("  John.Doe@Example.COM ") == "john.doe@example.com"
+    assert normalize_email(None) is None
+
+
+def test_normalize_phone():
+    """
+    Test that formatting is dropped and numbers end up in E.164 form.
+    """
+    assert normalize_phone("+1 (555) 123-4567") == "+15551234567"
+    assert normalize_phone("555.123.4567") == "+15551234567"  # National number gets the default country code
+    assert normalize_phone("555 123 4567", default_country_code="44") == "+445551234567"
+    assert normalize_phone("0044 20 7946 0958") == "+442079460958"
+    assert normalize_phone("--") is None
+
+
+def test_normalize_name():
+    """
+    Test that accents, case, punctuation, whitespace and word order are ignored.
+    """
+    assert normalize_name("José  Doe") == normalize_name("doe, JOSE") == "doe jose"
+    assert normalize_name("...") is None
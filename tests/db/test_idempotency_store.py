@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.idempotency import DatabaseIdempotencyStore, build_idempotency_store
+from app.core.idempotency import MemoryIdempotencyStore, NullIdempotencyStore
+from app.models.contact import Base
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'idempotency.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_database_store_reserve_and_complete(session_factory):
+    """
+    Test that a key is owned by the first request that reserves it, and that
+    its response is returned to later ones once complete.
+    """
+    store = DatabaseIdempotencyStore(session_factory, ttl=60)
+    assert store.reserve("k", "fingerprint") is None
+    assert store.reserve("k", "fingerprint").in_flight
+    store.complete("k", 201, [("etag", '"1.1"')], b'{"id": 1}')
+    record = store.reserve("k", "fingerprint")
+    assert (record.status, record.headers, record.body) == (201, [("etag", '"1.1"')], b'{"id": 1}')
+
+
+def test_database_store_release_and_expiry(session_factory):
+    store = DatabaseIdempotencyStore(session_factory, ttl=60, lease_seconds=0)
+    store.reserve("released", "fingerprint")
+    store.release("released")
+    assert store.get("released") is None
+
+    store.reserve("abandoned", "first")
+    assert store.reserve("abandoned", "second") is None  # The first reservation outlived its lease
+
+    expired = DatabaseIdempotencyStore(session_factory, ttl=0)
+    expired.reserve("old", "fingerprint")
+    assert expired.get("old") is None
+    assert expired.purge_expired() == 1
+
+
+def test_build_idempotency_store(session_factory):
+    assert isinstance(build_idempotency_store("database", 60, 60, session_factory), DatabaseIdempotencyStore)
+    assert isinstance(build_idempotency_store("memory", 60, 60), MemoryIdempotencyStore)
+    assert isinstance(build_idempotency_store("none", 60, 60), NullIdempotencyStore)
+    with pytest.raises(ValueError):
+        build_idempotency_store("redis", 60, 60)
@@ -0,0 +1,92 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from app.db import session
+from app.db.replicas import ReadYourWritesMiddleware, ReplicaRouter
+from app.main import app
+from app.models.contact import Base, Contact
+
+
+@pytest.fixture
+def replica_urls(tmp_path):
+    """
+    Two SQLite files standing in for replicas, each holding one contact named
+    after the replica so reads show which one served them.
+    """
+    urls = []
+    for name in ("replica-a", "replica-b"):
+        url = f"sqlite:///{tmp_path / name}.db"
+        router = ReplicaRouter([url])
+        Base.metadata.create_all(router.replicas[0].engine)
+        with router.replicas[0].engine.begin() as connection:
+            connection.execute(insert(Contact).values(id=1, name=name, email=f"{name}@example.com", phone="+123456789"))
+        router.dispose()
+        urls.append(url)
+    return urls
+
+
+@pytest.fixture
+def router(replica_urls):
+    router = ReplicaRouter(replica_urls)
+    yield router
+    router.dispose()
+
+
+def served_by(db) -> str:
+    return db.scalar(select(Contact.name).where(Contact.id == 1))
+
+
+def test_sessions_round_robin(router):
+    """
+    Test that consecutive sessions alternate between the replicas.
+    """
+    names = []
+    for _ in range(4):
+        db = router.session()
+        names.append(served_by(db))
+        db.close()
+    assert names == ["replica-a", "replica-b", "replica-a", "replica-b"]
+
+
+def test_unreachable_replica_is_skipped(replica_urls, tmp_path):
+    """
+    Test that a replica that cannot be connected to is skipped and that no
+    session is returned when every replica is down.
+    """
+    router = ReplicaRouter([f"sqlite:///{tmp_path}/missing/replica.db", replica_urls[1]])
+    for _ in range(3):
+        db = router.session()
+        assert served_by(db) == "replica-b"
+        db.close()
+    assert not router.replicas[0].available
+
+    down = ReplicaRouter([f"sqlite:///{tmp_path}/missing/replica.db"])
+    assert down.session() is None
+    router.dispose()
+    down.dispose()
+
+
+@pytest.fixture
+def replica_client(router, test_db, monkeypatch):
+    monkeypatch.setattr(session, "replica_router", router)
+    monkeypatch.setitem(app.dependency_overrides, session.get_db, lambda: test_db)
+    yield TestClient(ReadYourWritesMiddleware(app, sticky_seconds=5))
+
+
+def test_reads_use_replicas(replica_client):
+    """
+    Test that GET routes read from the replicas unless the client asks for the
+    primary, and that a write makes the client's next reads go to the primary.
+    """
+    replica_client.post("/api/v1/contacts/batch/get", json={"ids": [1]})  # Reads do not set the cookie
+    names = {replica_client.get("/api/v1/contacts/search", params={"q": "replica"}).json()[0]["name"] for _ in range(2)}
+    assert names == {"replica-a", "replica-b"}
+
+    response = replica_client.get("/api/v1/contacts/search", params={"q": "replica"}, headers={"X-Read-Primary": "1"})
+    assert response.json() == []  # The primary has no replica contacts
+
+    created = replica_client.post("/api/v1/contacts/", json={"name": "Primary", "email": "primary@example.com", "phone": "+123456789"})
+    assert "read_primary=1" in created.headers["set-cookie"]
+    response = replica_client.get("/api/v1/contacts/search", params={"q": "primary"})
+    assert [contact["name"] for contact in response.json()] == ["Primary"]  # Read your own write
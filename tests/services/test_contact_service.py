@@ -1,10 +1,18 @@
 import os
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
-from app.models.contact import Base
-from app.schemas.contact import ContactCreate
-from app.services.contact import get_contact, get_contacts, create_contact, update_contact, delete_contact
+from app.core.config import settings
+from app.models.contact import Base, Contact
+from app.schemas.contact import ContactCreate, ContactUpdate
+from app.services.contact_changes import get_changes, purge_tombstones
+from app.services.contact_dedup import find_duplicates, get_merge_suggestions, merge_contacts
+from app.services.contact import StaleContactError, get_contact, get_contacts, create_contact, update_contact, patch_contact, delete_contact, export_contacts
 
 # Setup the database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -13,6 +21,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 
 Base.metadata.create_all(bind=engine)
 
+CONCURRENT_CREATES = 8
+
 @pytest.fixture(scope="module")
 def db():
     db = TestingSessionLocal()
@@ -105,4 +115,202 @@ def test_delete_contact(db):
     created_contact = create_contact(db, contact_data)
     deleted_contact = delete_contact(db, created_contact.id)
     assert deleted_contact.id == created_contact.id
-    assert get_contact(db, created_contact.id) is None
\ No newline at end of file
+    assert get_contact(db, created_contact.id) is None
+
+def test_create_contact_duplicate_email(db):
+    """
+    Test that a duplicate email is rejected by the unique index and leaves the session usable.
+    """
+    contact_data = ContactCreate(name="Erin", email="erin@example.com", phone="+666666666")
+    create_contact(db, contact_data)
+    with pytest.raises(IntegrityError) as excinfo:
+        create_contact(db, contact_data)
+    assert excinfo.value.statement == "Email already exists"
+    assert get_contacts(db)  # The session was rolled back and can keep working
+
+def test_concurrent_creates_with_same_email():
+    """
+    Test that parallel creates with the same email produce exactly one contact.
+
+    Steps:
+    1. Fire several create_contact calls with the same email from parallel threads, each with its own session.
+    2. Assert that exactly one succeeds and the others fail with IntegrityError.
+    3. Assert that a single row with that email exists.
+    """
+    contact_data = ContactCreate(name="Frank", email="frank@example.com", phone="+777777777")
+    start = threading.Barrier(CONCURRENT_CREATES)
+
+    def create():
+        session = TestingSessionLocal()
+        try:
+            start.wait()
+            create_contact(session, contact_data)
+            return True
+        except IntegrityError:
+            return False
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=CONCURRENT_CREATES) as executor:
+        results = list(executor.map(lambda _: create(), range(CONCURRENT_CREATES)))
+
+    assert results.count(True) == 1
+    with TestingSessionLocal() as session:
+        assert session.query(Contact).filter(Contact.email == "frank@example.com").count() == 1
+
+def test_update_contact_bumps_version_and_updated_at(db):
+    """
+    Test that every update increments the row version and refreshes updated_at.
+    """
+    contact_data = ContactCreate(name="Grace", email="grace@example.com", phone="+888888888")
+    created_contact = create_contact(db, contact_data)
+    updated_contact = update_contact(db, created_contact.id, contact_data.model_copy(update={"name": "Grace H"}))
+    assert updated_contact.version == created_contact.version + 1
+    assert updated_contact.updated_at > created_contact.updated_at
+
+def test_update_contact_stale_version(db):
+    """
+    Test that an update expecting an old version fails without writing.
+    """
+    contact_data = ContactCreate(name="Heidi", email="heidi@example.com", phone="+999999999")
+    created_contact = create_contact(db, contact_data)
+    update_contact(db, created_contact.id, contact_data, expected_version=created_contact.version)
+    with pytest.raises(StaleContactError):
+        update_contact(db, created_contact.id, contact_data, expected_version=created_contact.version)
+    assert get_contact(db, created_contact.id).version == created_contact.version + 1
+
+def test_patch_contact_writes_only_changes(db):
+    """
+    Test that a partial update keeps the fields it leaves out, and that a
+    patch changing nothing does not bump the version or updated_at.
+    """
+    created_contact = create_contact(db, ContactCreate(name="Ivan", email="ivan@example.com", phone="+111222333", address="1 Old St"))
+    patched_contact = patch_contact(db, created_contact.id, ContactUpdate(address="2 New St"))
+    assert (patched_contact.name, patched_contact.address) == ("Ivan", "2 New St")
+    assert patched_contact.version == created_contact.version + 1
+    assert patched_contact.updated_at > created_contact.updated_at
+
+    unchanged_contact = patch_contact(db, created_contact.id, ContactUpdate(name="Ivan", address="2 New St"))
+    assert unchanged_contact.version == patched_contact.version
+    assert unchanged_contact.updated_at == patched_contact.updated_at
+
+def test_find_duplicates_and_merge(db):
+    """
+    Test that contacts differing only in email casing and phone formatting are
+    suggested as duplicates, and that merging keeps one of them.
+
+    Steps:
+    1. Create a contact, plus a near-duplicate written before normalization
+       existed and an unrelated contact.
+    2. Run the deduplication job and check the pair it suggests.
+    3. Merge the duplicate into the first contact and check the result.
+    """
+    first = create_contact(db, ContactCreate(name="Judy Hopps", email="judy@example.com", phone="+15551234567"))
+    db.execute(insert(Contact).values(name="judy  hopps", email="JUDY@example.com", phone="(555) 123-4567", address="1 Zoo St"))
+    db.commit()
+    second = db.query(Contact).filter(Contact.email == "JUDY@example.com").one()
+    create_contact(db, ContactCreate(name="Nick Wilde", email="nick@example.com", phone="+15557654321"))
+
+    report = find_duplicates(db, min_score=0.45)
+    suggestions = get_merge_suggestions(db)
+    assert report.suggestions == 1
+    assert [(s["contact"]["id"], s["duplicate"]["id"]) for s in suggestions] == [(first.id, second.id)]
+    assert suggestions[0]["reasons"] == ["email", "phone", "name"]
+
+    merged = merge_contacts(db, first.id, [second.id])
+    assert merged.address == "1 Zoo St"  # Filled from the duplicate
+    assert merged.version == first.version + 1
+    assert get_contact(db, second.id) is None
+    assert get_merge_suggestions(db) == []
+
+def test_find_duplicates_skips_names_below_min_score(db):
+    """
+    Test that contacts sharing only their name are not even paired at the
+    default minimum score, which a name match alone cannot reach, and are
+    suggested when the minimum score is that low.
+    """
+    create_contact(db, ContactCreate(name="Judy Hopps", email="judy@example.com", phone="+15551234567"))
+    create_contact(db, ContactCreate(name="Hopps, Judy", email="jhopps@example.com", phone="+15557654321"))
+
+    report = find_duplicates(db)
+    assert (report.candidate_pairs, report.suggestions) == (0, 0)
+    report = find_duplicates(db, min_score=0.2)
+    assert (report.candidate_pairs, report.suggestions) == (1, 1)
+    assert get_merge_suggestions(db)[0]["reasons"] == ["name"]
+
+def test_purge_tombstones(db, monkeypatch):
+    """
+    Test that deleting keeps a tombstone in the change feed until it is purged.
+
+    Steps:
+    1. Create and delete a contact.
+    2. Assert that the change feed reports it as deleted.
+    3. Purge tombstones older than the retention, then all of them.
+    4. Assert that the contact is only gone once it is past the retention.
+    """
+    monkeypatch.setattr(settings, "CHANGE_FEED_LAG_SECONDS", 0)
+    created_contact = create_contact(db, ContactCreate(name="Karl", email="karl@example.com", phone="+121212121"))
+    delete_contact(db, created_contact.id)
+    changes, _ = get_changes(db, limit=1000)
+    deleted = [change for change in changes if change.id == created_contact.id]
+    assert deleted and deleted[0].deleted_at is not None
+
+    assert purge_tombstones(db, retention_days=1) == 0
+    assert purge_tombstones(db, retention_days=0) >= 1
+    assert db.query(Contact).execution_options(include_deleted=True).filter(Contact.id == created_contact.id).count() == 0
+
+def test_purge_tombstones_uses_deleted_at_index(db):
+    plan = db.execute(text("EXPLAIN QUERY PLAN SELECT id FROM contacts WHERE deleted_at < :cutoff LIMIT 1000"), {"cutoff": "2026-01-01"}).all()
+    assert any("ix_contacts_deleted_at" in row[-1] for row in plan)
+
+def test_create_contact_timestamps(db):
+    """
+    Test that created_at and updated_at are set when each contact is written,
+    not once when the application starts.
+    """
+    first = create_contact(db, ContactCreate(name="Liam", email="liam@example.com", phone="+131313131"))
+    second = create_contact(db, ContactCreate(name="Mia", email="mia@example.com", phone="+141414141"))
+    assert second.created_at > first.created_at
+    assert second.updated_at > first.updated_at
+
+# Row counts exported one after the other: the larger export must not need
+# more memory than the smaller one, which a buffered export would.
+EXPORT_ROWS = (10_000, 100_000)
+EXPORT_MAX_TRACED_PEAK_MB = 16
+
+def test_export_contacts_memory_is_flat():
+    """
+    Test that exporting a large table keeps memory flat.
+
+    Steps:
+    1. Seed synthetic contacts with a single INSERT ... SELECT, without building them in Python.
+    2. Consume the NDJSON export of the whole table while tracing Python allocations.
+    3. Grow the table tenfold and export it again.
+    4. Assert that every row was exported each time.
+    5. Assert that the peak of memory allocated during the larger export stayed under a fixed bound
+       and did not grow with the table.
+    """
+    peaks = []
+    seeded = 0
+    for rows in EXPORT_ROWS:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "WITH RECURSIVE seq(i) AS (SELECT :first UNION ALL SELECT i + 1 FROM seq WHERE i < :last) "
+                "INSERT INTO contacts (name, email, phone, address) "
+                "SELECT 'Contact ' || i, 'contact' || i || '@example.com', '+1' || (1000000000 + i), i || ' Export St' FROM seq"
+            ), {"first": seeded + 1, "last": rows})
+        seeded = rows
+
+        # Measured from the start of the export, unlike ru_maxrss, which is the
+        # peak of the whole process and hides growth below an earlier high.
+        tracemalloc.start()
+        try:
+            exported = sum(chunk.count(b"\n") for chunk in export_contacts(TestingSessionLocal(), "ndjson"))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert exported == rows
+        peaks.append(peak)
+
+    assert peaks[-1] / (1024 * 1024) < EXPORT_MAX_TRACED_PEAK_MB
+    assert peaks[-1] < 2 * peaks[0]